@@ -50,6 +50,7 @@ hiddenimports = [
     'numpy',
     'requests',
     'magic',
+    'zstandard',
     'ttkthemes',
 ]
 
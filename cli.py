@@ -97,8 +97,8 @@ class DentalDataCLI:
         
         # Summary
         total_patients = len(project_data.patients)
-        complete_patients = len(project_data.get_complete_patients())
-        incomplete_patients = len(project_data.get_incomplete_patients())
+        complete_patients = project_data.count_complete()
+        incomplete_patients = total_patients - complete_patients
         
         print(f"\nSUMMARY:")
         print(f"  Total Patients: {total_patients}")
@@ -191,7 +191,7 @@ class DentalDataCLI:
                 print(f"IOS Folder: {patient.ios_folder}")
                 
             print("\nAll Files:")
-            for file_data in patient.get_all_files():
+            for file_data in patient.iter_all_files():
                 confidence = f"{file_data.confidence:.1%}" if file_data.confidence > 0 else "N/A"
                 data_type = file_data.data_type.value if file_data.data_type else "Unknown"
                 print(f"  {file_data.filename}")
@@ -645,7 +645,7 @@ class TF4MAPIClient:
             # Handle ZIP files (data_type might be None) or use mapping
             if data_type is None:
                 # For ZIP files, check file extension
-                if file_data.path.lower().endswith('.zip'):
+                if file_data.extension == '.zip':
                     tf4m_modality = 'rawzip'
                 else:
                     tf4m_modality = 'rawzip'  # Default to rawzip for unknown files
@@ -0,0 +1,50 @@
+"""
+Filename rules used by smart auto-mapping to suggest data types.
+"""
+
+from itertools import repeat
+from typing import List, Optional
+import re
+
+from .models import DataType
+
+# Filename keywords used by smart auto-mapping (plain substrings, any case)
+_UPPER_KEYWORDS = ('upper', 'max', 'superiore', 'mascella', 'mascellare', 'maxilla',
+                   'maxillari', 'maxillar', 'maxillary')
+_LOWER_KEYWORDS = ('lower', 'man', 'inferiore', 'mandibola', 'mandibolar', 'mandible',
+                   'mandibular')
+
+# Compiled once so each file needs a single regex call per check
+_CBCT_RE = re.compile(r'\.dcm$|slice|3d|cbct', re.IGNORECASE)
+
+# Classifies an STL filename in one match(); the lastgroup names the jaw.
+# Upper keywords are tried anywhere in the name before lower ones, so a name
+# containing both still maps to the upper jaw.
+_STL_JAW_RE = re.compile(
+    r'(?s)(?=.*?(?P<upper>%s))|(?=.*?(?P<lower>%s))' % (
+        '|'.join(map(re.escape, _UPPER_KEYWORDS)),
+        '|'.join(map(re.escape, _LOWER_KEYWORDS))),
+    re.IGNORECASE)
+_JAW_DATA_TYPES = {'upper': DataType.IOS_UPPER, 'lower': DataType.IOS_LOWER}
+
+def classify_filenames(filenames: List[str], map_cbct: bool = True,
+                       map_stl: bool = True) -> List[Optional[DataType]]:
+    """Suggest the data type of each file from its name, as smart auto-mapping does.
+    
+    Returns one entry per name, None where no enabled rule matches.
+    """
+    # map() calls the compiled pattern from C instead of per-file bytecode
+    cbct_hits = map(_CBCT_RE.search, filenames) if map_cbct else repeat(None)
+    suggestions = []
+    for filename, cbct_hit in zip(filenames, cbct_hits):
+        suggested_type = None
+        # CBCT DICOM detection
+        if cbct_hit:
+            suggested_type = DataType.CBCT_DICOM
+        # STL file patterns (upper jaw keywords win over lower ones)
+        elif map_stl and filename[-4:].lower() == '.stl':
+            match = _STL_JAW_RE.match(filename)
+            if match:
+                suggested_type = _JAW_DATA_TYPES[match.lastgroup]
+        suggestions.append(suggested_type)
+    return suggestions
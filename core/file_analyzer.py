@@ -4,6 +4,7 @@ File analysis module for detecting and categorizing dental data files.
 
 import os
 import re
+import threading
 from typing import Optional, Tuple, List
 from PIL import Image
 import pydicom
@@ -110,6 +111,10 @@ class FileAnalyzer:
         self.match_cache = MatchCache()
         self.logger = logging.getLogger(__name__)
         
+        # Folder scans run on a wide I/O pool; dcm2niix and zip building are
+        # CPU/disk heavy, so at most one per core runs at a time
+        self._post_processing_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
+        
         # Clean up expired cache entries on initialization (only for centralized cache)
         if self.match_cache.centralized_cache:
             self.match_cache.cleanup_expired_entries()
@@ -133,6 +138,7 @@ class FileAnalyzer:
                 self.logger.info(f"Using cached matches for {os.path.basename(folder_path)}")
                 # Still need to run post-processing for CBCT conversion and zip creation
                 self._run_post_processing(cached_data)
+                cached_data.rebuild_path_index()
                 return cached_data
         
         # Perform fresh analysis
@@ -164,6 +170,7 @@ class FileAnalyzer:
         
         # Run post-processing
         self._run_post_processing(patient_data)
+        patient_data.rebuild_path_index()
         
         # Cache the results for future use
         if use_cache:
@@ -173,6 +180,11 @@ class FileAnalyzer:
     
     def _run_post_processing(self, patient_data: PatientData):
         """Run post-processing steps like CBCT conversion and zip creation."""
+        with self._post_processing_slots:
+            self._run_post_processing_steps(patient_data)
+    
+    def _run_post_processing_steps(self, patient_data: PatientData):
+        """Convert CBCT and build the zip package (callers hold a post-processing slot)."""
         # Automatically convert CBCT to NIfTI if CBCT data is found
         if patient_data.cbct_files and patient_data.cbct_folder:
             project_root = os.path.dirname(patient_data.folder_path)
@@ -646,8 +658,8 @@ class FileAnalyzer:
             return True
             
         try:
-            # Try to read as DICOM
-            pydicom.dcmread(file_path, force=True)
+            # Try to read as DICOM (header only - pixel data is not needed here)
+            pydicom.dcmread(file_path, force=True, stop_before_pixels=True)
             return True
         except:
             # Check MIME type if magic is available
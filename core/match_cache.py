@@ -7,15 +7,53 @@ results, allowing users to avoid recreating matches when reloading the same fold
 
 import os
 import json
+import sqlite3
 import hashlib
+import threading
 import time
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
 import logging
 
+# Try to import zstandard for compressed per-patient cache files (optional)
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 from .models import PatientData, FileData, DataType, MatchStatus
 
+# Per-patient cache file names (distributed mode)
+LEGACY_CACHE_FILENAME = ".tf4m_cache.json"
+COMPRESSED_CACHE_FILENAME = ".tf4m_cache.json.zst"
+CACHE_FILENAMES = {LEGACY_CACHE_FILENAME, COMPRESSED_CACHE_FILENAME}
+ZSTD_LEVEL = 3
+
+# SQLite storage (centralized mode)
+SQLITE_CACHE_FILENAME = "matches.sqlite"
+LEGACY_CENTRAL_CACHE_FILENAME = "patient_matches.json"
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    cache_key TEXT PRIMARY KEY,
+    patient_id TEXT,
+    folder_hash TEXT,
+    timestamp REAL,
+    upload_status TEXT,
+    remote_patient_id INTEGER,
+    payload BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_entries_upload_status ON entries(upload_status);
+CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(timestamp);
+"""
+
+# Sidecar index of upload state (distributed mode)
+UPLOAD_INDEX_FILENAME = "uploaded_index.json"
+# Serializes read-modify-write of the upload index across MatchCache instances
+_UPLOAD_INDEX_LOCK = threading.Lock()
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".tf4m")
+
 
 @dataclass
 class CacheEntry:
@@ -94,11 +132,16 @@ class MatchCache:
         
         if self.centralized_cache:
             self.ensure_cache_dir()
-            self.cache_file = os.path.join(self.cache_dir, "patient_matches.json")
+            self.cache_file = os.path.join(self.cache_dir, SQLITE_CACHE_FILENAME)
         else:
             self.cache_file = None  # Will be determined per patient folder
             
-        self.cache_data: Dict[str, CacheEntry] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        
+        # Sidecar index of upload state, so distributed mode can answer
+        # cross-patient upload queries without scanning every patient folder
+        self._upload_index_path = os.path.join(cache_dir or DEFAULT_INDEX_DIR, UPLOAD_INDEX_FILENAME)
         
         if self.centralized_cache:
             self.load_cache()
@@ -122,15 +165,12 @@ class MatchCache:
             stat = os.stat(folder_path)
             hasher.update(f"{stat.st_mtime}_{stat.st_size}".encode())
             
-            # Get cache file name to exclude it from hash calculation
-            cache_filename = os.path.basename(self.get_patient_cache_file(folder_path))
-            
             # Include file list and their modification times
             files = []
             for root, dirs, filenames in os.walk(folder_path):
                 for filename in sorted(filenames):
-                    # Skip cache file to avoid hash invalidation when cache is created
-                    if filename == cache_filename:
+                    # Skip cache files to avoid hash invalidation when cache is created
+                    if filename in CACHE_FILENAMES:
                         continue
                         
                     file_path = os.path.join(root, filename)
@@ -151,18 +191,34 @@ class MatchCache:
     
     def get_patient_cache_file(self, folder_path: str) -> str:
         """Get cache file path for a specific patient folder."""
-        return os.path.join(folder_path, ".tf4m_cache.json")
+        if ZSTD_AVAILABLE:
+            return os.path.join(folder_path, COMPRESSED_CACHE_FILENAME)
+        return os.path.join(folder_path, LEGACY_CACHE_FILENAME)
     
-    def load_patient_cache(self, folder_path: str) -> Dict[str, CacheEntry]:
-        """Load cache data for a specific patient folder."""
-        cache_file = self.get_patient_cache_file(folder_path)
+    def _read_patient_cache_file(self, folder_path: str) -> Optional[Dict[str, Any]]:
+        """Read the raw cache dict for a patient folder.
         
-        if not os.path.exists(cache_file):
-            return {}
+        Prefers the zstd-compressed cache file and falls back to the legacy
+        uncompressed JSON file written by older versions.
+        """
+        compressed_file = os.path.join(folder_path, COMPRESSED_CACHE_FILENAME)
+        if ZSTD_AVAILABLE and os.path.exists(compressed_file):
+            with open(compressed_file, 'rb') as f:
+                return json.loads(zstd.ZstdDecompressor().decompress(f.read()))
+        
+        legacy_file = os.path.join(folder_path, LEGACY_CACHE_FILENAME)
+        if os.path.exists(legacy_file):
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
         
+        return None
+    
+    def load_patient_cache(self, folder_path: str) -> Dict[str, CacheEntry]:
+        """Load cache data for a specific patient folder."""
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self._read_patient_cache_file(folder_path)
+            if data is None:
+                return {}
                 
             # Convert to CacheEntry objects
             cache_data = {}
@@ -171,8 +227,8 @@ class MatchCache:
                 
             return cache_data
             
-        except (IOError, json.JSONDecodeError) as e:
-            self.logger.warning(f"Error loading patient cache from {cache_file}: {e}")
+        except Exception as e:
+            self.logger.warning(f"Error loading patient cache from {folder_path}: {e}")
             return {}
     
     def save_patient_cache(self, folder_path: str, cache_data: Dict[str, CacheEntry]):
@@ -202,64 +258,126 @@ class MatchCache:
                     'version': entry.version
                 }
             
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            if ZSTD_AVAILABLE:
+                payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+                with open(cache_file, 'wb') as f:
+                    f.write(zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(payload))
                 
-        except IOError as e:
+                # Drop the legacy uncompressed file once it has been migrated
+                legacy_file = os.path.join(folder_path, LEGACY_CACHE_FILENAME)
+                if os.path.exists(legacy_file):
+                    os.remove(legacy_file)
+            else:
+                with open(cache_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                
+        except (IOError, OSError) as e:
             self.logger.error(f"Error saving patient cache to {cache_file}: {e}")
     
     def load_cache(self):
-        """Load cache from disk."""
+        """Open the centralized SQLite cache, migrating a legacy JSON cache if present."""
         if not self.centralized_cache:
             # For distributed cache, load per patient as needed
-            self.cache_data = {}
             return
-            
-        if not os.path.exists(self.cache_file):
-            self.cache_data = {}
+        
+        try:
+            self._conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SQLITE_SCHEMA)
+            self._conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error opening cache database: {e}")
+            self._conn = None
+            return
+        
+        self._migrate_legacy_cache()
+    
+    def _migrate_legacy_cache(self):
+        """Import entries from the legacy patient_matches.json into SQLite."""
+        legacy_file = os.path.join(self.cache_dir, LEGACY_CENTRAL_CACHE_FILENAME)
+        if not os.path.exists(legacy_file):
             return
         
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                
-            self.cache_data = {}
+            
             for key, entry_data in data.items():
                 try:
-                    self.cache_data[key] = CacheEntry.from_dict(entry_data)
+                    self._db_put(key, CacheEntry.from_dict(entry_data))
                 except Exception as e:
-                    self.logger.warning(f"Error loading cache entry {key}: {e}")
-                    
+                    self.logger.warning(f"Error migrating cache entry {key}: {e}")
+            
+            # Keep the old file around but stop re-importing it
+            os.replace(legacy_file, legacy_file + ".migrated")
+            self.logger.info(f"Migrated {len(data)} cache entries to {self.cache_file}")
+            
         except Exception as e:
-            self.logger.error(f"Error loading cache file: {e}")
-            self.cache_data = {}
+            self.logger.error(f"Error migrating legacy cache file: {e}")
     
     def save_cache(self):
-        """Save cache to disk."""
+        """Flush pending cache writes to disk."""
         if not self.centralized_cache:
             self.logger.warning("save_cache() called for distributed cache mode")
             return
-            
+        
+        if self._conn is None:
+            return
+        
         try:
-            # Convert to serializable format
-            data = {}
-            for key, entry in self.cache_data.items():
-                data[key] = entry.to_dict()
-            
-            # Atomic write
-            temp_file = self.cache_file + ".tmp"
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            # Replace original file
-            if os.path.exists(self.cache_file):
-                os.remove(self.cache_file)
-            os.rename(temp_file, self.cache_file)
-            
-            self.logger.info(f"Cache saved with {len(self.cache_data)} entries")
-            
+            with self._db_lock:
+                self._conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error saving cache database: {e}")
+    
+    def _row_to_entry(self, row) -> CacheEntry:
+        """Decode a stored payload back into a CacheEntry."""
+        return CacheEntry.from_dict(json.loads(row[0]))
+    
+    def _db_get(self, cache_key: str) -> Optional[CacheEntry]:
+        """Fetch a single cache entry from the centralized database."""
+        if self._conn is None:
+            return None
+        
+        try:
+            with self._db_lock:
+                row = self._conn.execute(
+                    'SELECT payload FROM entries WHERE cache_key = ?', (cache_key,)
+                ).fetchone()
+            return self._row_to_entry(row) if row else None
         except Exception as e:
-            self.logger.error(f"Error saving cache file: {e}")
+            self.logger.warning(f"Error loading cache entry {cache_key}: {e}")
+            return None
+    
+    def _db_put(self, cache_key: str, entry: CacheEntry):
+        """Insert or replace a single cache entry in the centralized database."""
+        if self._conn is None:
+            return
+        
+        payload = json.dumps(entry.to_dict(), ensure_ascii=False).encode('utf-8')
+        try:
+            with self._db_lock, self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO entries '
+                    '(cache_key, patient_id, folder_hash, timestamp, upload_status, remote_patient_id, payload) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (cache_key, entry.patient_id, entry.folder_hash, entry.timestamp,
+                     entry.upload_status, entry.remote_patient_id, payload)
+                )
+        except sqlite3.Error as e:
+            self.logger.error(f"Error saving cache entry {cache_key}: {e}")
+    
+    def _db_execute(self, sql: str, params: tuple = ()) -> int:
+        """Run a write statement against the centralized database, returning affected rows."""
+        if self._conn is None:
+            return 0
+        
+        try:
+            with self._db_lock, self._conn:
+                return self._conn.execute(sql, params).rowcount
+        except sqlite3.Error as e:
+            self.logger.error(f"Error updating cache database: {e}")
+            return 0
     
     def get_cached_matches(self, folder_path: str) -> Optional[PatientData]:
         """Retrieve cached matching results for a folder.
@@ -274,24 +392,24 @@ class MatchCache:
         
         # Load cache data for this patient
         if self.centralized_cache:
-            cache_data = self.cache_data
+            entry = self._db_get(cache_key)
         else:
             cache_data = self.load_patient_cache(folder_path)
+            entry = cache_data.get(cache_key)
         
-        if cache_key not in cache_data:
+        if entry is None:
             self.logger.debug(f"No cache entry found for {folder_path}")
             return None
         
-        entry = cache_data[cache_key]
         current_hash = self.get_folder_hash(folder_path)
         
         if not entry.is_valid(current_hash):
             self.logger.info(f"Cache entry for {folder_path} is invalid (hash mismatch or expired)")
             # Remove invalid entry
-            del cache_data[cache_key]
             if self.centralized_cache:
-                self.save_cache()
+                self._db_execute('DELETE FROM entries WHERE cache_key = ?', (cache_key,))
             else:
+                del cache_data[cache_key]
                 self.save_patient_cache(folder_path, cache_data)
             return None
         
@@ -348,8 +466,7 @@ class MatchCache:
         
         # Save cache entry
         if self.centralized_cache:
-            self.cache_data[cache_key] = entry
-            self.save_cache()
+            self._db_put(cache_key, entry)
         else:
             # Load existing patient cache, update it, and save
             cache_data = self.load_patient_cache(patient_data.folder_path)
@@ -458,25 +575,24 @@ class MatchCache:
         cache_key = self.get_cache_key(folder_path)
         
         if self.centralized_cache:
-            if cache_key in self.cache_data:
-                del self.cache_data[cache_key]
-                self.save_cache()
+            if self._db_execute('DELETE FROM entries WHERE cache_key = ?', (cache_key,)):
                 self.logger.info(f"Invalidated cache for {folder_path}")
         else:
-            # For distributed cache, delete the cache file
-            cache_file = self.get_patient_cache_file(folder_path)
-            if os.path.exists(cache_file):
-                try:
-                    os.remove(cache_file)
-                    self.logger.info(f"Invalidated cache for {folder_path}")
-                except OSError as e:
-                    self.logger.error(f"Error removing cache file {cache_file}: {e}")
+            # For distributed cache, delete the cache files (compressed and legacy)
+            for cache_filename in CACHE_FILENAMES:
+                cache_file = os.path.join(folder_path, cache_filename)
+                if os.path.exists(cache_file):
+                    try:
+                        os.remove(cache_file)
+                        self.logger.info(f"Invalidated cache for {folder_path}")
+                    except OSError as e:
+                        self.logger.error(f"Error removing cache file {cache_file}: {e}")
+            self._remove_from_upload_index(cache_key)
     
     def clear_cache(self):
         """Clear all cache entries."""
         if self.centralized_cache:
-            self.cache_data = {}
-            self.save_cache()
+            self._db_execute('DELETE FROM entries')
             self.logger.info("Cleared all cache entries")
         else:
             self.logger.warning("clear_cache() not supported for distributed cache mode")
@@ -487,20 +603,13 @@ class MatchCache:
             self.logger.warning("cleanup_expired_entries() not supported for distributed cache mode")
             return
             
-        current_time = time.time()
         max_age_seconds = max_age_days * 24 * 60 * 60
+        cutoff = time.time() - max_age_seconds
         
-        expired_keys = []
-        for key, entry in self.cache_data.items():
-            if current_time - entry.timestamp > max_age_seconds:
-                expired_keys.append(key)
+        expired_count = self._db_execute('DELETE FROM entries WHERE timestamp < ?', (cutoff,))
         
-        for key in expired_keys:
-            del self.cache_data[key]
-        
-        if expired_keys:
-            self.save_cache()
-            self.logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
+        if expired_count:
+            self.logger.info(f"Cleaned up {expired_count} expired cache entries")
     
     def update_upload_status(self, folder_path: str, status: str, 
                            remote_patient_id: Optional[int] = None, 
@@ -510,8 +619,8 @@ class MatchCache:
         cache_key = self.get_cache_key(folder_path)
         
         if self.centralized_cache:
-            if cache_key in self.cache_data:
-                entry = self.cache_data[cache_key]
+            entry = self._db_get(cache_key)
+            if entry is not None:
                 entry.upload_status = status
                 entry.last_upload_attempt = time.time()
                 if remote_patient_id is not None:
@@ -520,7 +629,7 @@ class MatchCache:
                     entry.upload_error_message = error_message
                 if uploaded_file_hashes:
                     entry.uploaded_file_hashes.update(uploaded_file_hashes)
-                self.save_cache()
+                self._db_put(cache_key, entry)
         else:
             # Distributed cache
             cache_data = self.load_patient_cache(folder_path)
@@ -535,13 +644,63 @@ class MatchCache:
                 if uploaded_file_hashes:
                     entry.uploaded_file_hashes.update(uploaded_file_hashes)
                 self.save_patient_cache(folder_path, cache_data)
+                self._update_upload_index(cache_key, entry)
+    
+    def _load_upload_index(self) -> Dict[str, Dict[str, Any]]:
+        """Read the upload index sidecar.
+        
+        Always read from disk: other MatchCache instances (and processes)
+        write the same file, so a copy kept in memory would go stale.
+        """
+        if os.path.exists(self._upload_index_path):
+            try:
+                with open(self._upload_index_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                self.logger.warning(f"Error loading upload index {self._upload_index_path}: {e}")
+        return {}
+    
+    def _save_upload_index(self, index: Dict[str, Dict[str, Any]]):
+        """Write the upload index sidecar atomically."""
+        try:
+            os.makedirs(os.path.dirname(self._upload_index_path), exist_ok=True)
+            
+            # Atomic write (per-process temp file, so concurrent writers don't share it)
+            temp_file = f"{self._upload_index_path}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(temp_file, self._upload_index_path)
+            
+        except (IOError, OSError) as e:
+            self.logger.error(f"Error saving upload index {self._upload_index_path}: {e}")
+    
+    def _update_upload_index(self, cache_key: str, entry: CacheEntry):
+        """Record the upload state of a patient in the sidecar index."""
+        with _UPLOAD_INDEX_LOCK:
+            # Re-read right before writing so updates made elsewhere are kept
+            index = self._load_upload_index()
+            index[cache_key] = {
+                'patient_id': entry.patient_id,
+                'folder_path': entry.folder_path,
+                'status': entry.upload_status,
+                'remote_patient_id': entry.remote_patient_id,
+                'ts': entry.last_upload_attempt
+            }
+            self._save_upload_index(index)
+    
+    def _remove_from_upload_index(self, cache_key: str):
+        """Drop a patient from the sidecar index once its cache is invalidated."""
+        with _UPLOAD_INDEX_LOCK:
+            index = self._load_upload_index()
+            if index.pop(cache_key, None) is not None:
+                self._save_upload_index(index)
     
     def get_upload_status(self, folder_path: str) -> Optional[Dict[str, Any]]:
         """Get upload status for a patient."""
         cache_key = self.get_cache_key(folder_path)
         
         if self.centralized_cache:
-            entry = self.cache_data.get(cache_key)
+            entry = self._db_get(cache_key)
         else:
             cache_data = self.load_patient_cache(folder_path)
             entry = cache_data.get(cache_key)
@@ -561,8 +720,18 @@ class MatchCache:
         uploaded_patients = []
         
         if self.centralized_cache:
-            for entry in self.cache_data.values():
-                if entry.upload_status == "uploaded" and entry.remote_patient_id:
+            if self._conn is None:
+                return uploaded_patients
+            
+            with self._db_lock:
+                rows = self._conn.execute(
+                    "SELECT payload FROM entries "
+                    "WHERE upload_status = 'uploaded' AND remote_patient_id IS NOT NULL"
+                ).fetchall()
+            
+            for row in rows:
+                entry = self._row_to_entry(row)
+                if entry.remote_patient_id:
                     uploaded_patients.append({
                         'patient_id': entry.patient_id,
                         'folder_path': entry.folder_path,
@@ -570,9 +739,16 @@ class MatchCache:
                         'last_upload_attempt': entry.last_upload_attempt
                     })
         else:
-            # For distributed cache, we'd need to scan all patient folders
-            # This is more expensive, so we'll return empty list for now
-            pass
+            # For distributed cache, answer from the upload index sidecar
+            # (writers replace the file atomically, so no lock is needed to read it)
+            for record in self._load_upload_index().values():
+                if record.get('status') == "uploaded" and record.get('remote_patient_id'):
+                    uploaded_patients.append({
+                        'patient_id': record.get('patient_id'),
+                        'folder_path': record.get('folder_path'),
+                        'remote_patient_id': record.get('remote_patient_id'),
+                        'last_upload_attempt': record.get('ts')
+                    })
         
         return uploaded_patients
     
@@ -588,9 +764,15 @@ class MatchCache:
                 'mode': 'distributed'
             }
             
-        total_entries = len(self.cache_data)
-        total_matched_files = sum(len(entry.matched_files) for entry in self.cache_data.values())
-        total_unmatched_files = sum(len(entry.unmatched_files) for entry in self.cache_data.values())
+        entries = []
+        if self._conn is not None:
+            with self._db_lock:
+                rows = self._conn.execute('SELECT payload FROM entries').fetchall()
+            entries = [self._row_to_entry(row) for row in rows]
+        
+        total_entries = len(entries)
+        total_matched_files = sum(len(entry.matched_files) for entry in entries)
+        total_unmatched_files = sum(len(entry.unmatched_files) for entry in entries)
         
         # Calculate cache size
         cache_size = 0
@@ -599,8 +781,8 @@ class MatchCache:
         
         oldest_entry = None
         newest_entry = None
-        if self.cache_data:
-            timestamps = [entry.timestamp for entry in self.cache_data.values()]
+        if entries:
+            timestamps = [entry.timestamp for entry in entries]
             oldest_entry = datetime.fromtimestamp(min(timestamps))
             newest_entry = datetime.fromtimestamp(max(timestamps))
         
@@ -3,10 +3,16 @@ Data models for the dental data management application.
 """
 
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 from enum import Enum
 import os
 
+# System files that never count as significant unmatched files
+_SYSTEM_FILES: frozenset = frozenset({'.ds_store', 'thumbs.db', 'desktop.ini'})
+
+# Characters that end the directory/drive part of a path on this platform
+_PATH_SEPARATORS = (os.sep, os.altsep, ':') if os.name == 'nt' else (os.sep,)
+
 class DataType(Enum):
     """Enumeration of different data types in a patient folder."""
     CBCT_DICOM = "cbct_dicom"
@@ -25,24 +31,33 @@ class MatchStatus(Enum):
     AMBIGUOUS = "ambiguous"
     MANUAL = "manual"
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class FileData:
-    """Represents a file in the patient data structure."""
+    """Represents a file in the patient data structure.
+    
+    Instances compare (and hash) by identity: a FileData stands for one
+    tracked file, so list membership and removal never compare field by field.
+    """
     path: str
     data_type: Optional[DataType] = None
     confidence: float = 0.0
     status: MatchStatus = MatchStatus.UNMATCHED
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # time.monotonic() of the last successful existence check (0 = never)
+    exists_checked_at: float = field(default=0.0, repr=False)
+    # Derived from path once at construction time
+    filename: str = field(init=False, repr=False)
+    extension: str = field(init=False, repr=False)
     
-    @property
-    def filename(self) -> str:
-        return os.path.basename(self.path)
-    
-    @property
-    def extension(self) -> str:
-        return os.path.splitext(self.path)[1].lower()
+    def __post_init__(self):
+        # Same results as os.path.basename/splitext, without their per-call dispatch
+        path = self.path
+        filename = path[max(path.rfind(sep) for sep in _PATH_SEPARATORS) + 1:]
+        dot = filename.rfind('.')
+        self.filename = filename
+        self.extension = filename[dot:].lower() if dot > 0 and filename[:dot].lstrip('.') else ''
 
-@dataclass
+@dataclass(slots=True)
 class PatientData:
     """Represents all data for a single patient."""
     patient_id: str
@@ -65,22 +80,51 @@ class PatientData:
     nifti_conversion_info: Dict[str, Any] = field(default_factory=dict)
     zip_package_path: Optional[str] = None
     zip_package_info: Dict[str, Any] = field(default_factory=dict)
+    # Memoized is_complete() result: (snapshot of the file slots, unmatched_files list it was
+    # computed for, result). The list itself is held so a replaced list is never mistaken for it.
+    _completeness_cache: Optional[Tuple[tuple, list, bool]] = field(default=None, init=False, repr=False, compare=False)
+    # path -> FileData lookup for all files of this patient
+    _path_index: Dict[str, FileData] = field(default_factory=dict, init=False, repr=False, compare=False)
     
-    def get_all_files(self) -> List[FileData]:
-        """Get all files associated with this patient."""
-        files = []
-        files.extend(self.cbct_files)
+    def iter_all_files(self) -> Iterator[FileData]:
+        """Iterate over all files associated with this patient without building a list."""
+        yield from self.cbct_files
         if self.ios_upper:
-            files.append(self.ios_upper)
+            yield self.ios_upper
         if self.ios_lower:
-            files.append(self.ios_lower)
-        files.extend(self.intraoral_photos)
+            yield self.ios_lower
+        yield from self.intraoral_photos
         if self.teleradiography:
-            files.append(self.teleradiography)
+            yield self.teleradiography
         if self.orthopantomography:
-            files.append(self.orthopantomography)
-        files.extend(self.unmatched_files)
-        return files
+            yield self.orthopantomography
+        yield from self.unmatched_files
+    
+    def get_all_files(self) -> List[FileData]:
+        """Get all files associated with this patient."""
+        return list(self.iter_all_files())
+    
+    def rebuild_path_index(self):
+        """Rebuild the path -> FileData index from the current file assignments."""
+        self._path_index = {f.path: f for f in self.iter_all_files()}
+    
+    def index_file(self, file_data: FileData):
+        """Register a file in the path index."""
+        self._path_index[file_data.path] = file_data
+    
+    def unindex_file(self, file_data: FileData):
+        """Remove a file from the path index."""
+        if self._path_index.get(file_data.path) is file_data:
+            del self._path_index[file_data.path]
+    
+    def find_file(self, path: str) -> Optional[FileData]:
+        """Find a file of this patient by path."""
+        file_data = self._path_index.get(path)
+        if file_data is None:
+            # Files may have been attached directly to the lists; resync once
+            self.rebuild_path_index()
+            file_data = self._path_index.get(path)
+        return file_data
     
     def get_missing_data_types(self) -> List[DataType]:
         """Get list of missing required data types."""
@@ -97,21 +141,59 @@ class PatientData:
             missing.append(DataType.ORTHOPANTOMOGRAPHY)
         return missing
     
+    def _has_all_required(self) -> bool:
+        """Check that no required data type is missing, stopping at the first gap."""
+        return (
+            bool(self.cbct_files) and
+            self.ios_upper is not None and
+            self.ios_lower is not None and
+            self.teleradiography is not None and
+            self.orthopantomography is not None
+        )
+    
+    def _completeness_key(self) -> tuple:
+        """Cheap snapshot of the state is_complete() depends on."""
+        return (
+            bool(self.cbct_files),
+            self.ios_upper is not None,
+            self.ios_lower is not None,
+            self.teleradiography is not None,
+            self.orthopantomography is not None,
+            len(self.unmatched_files)
+        )
+    
+    def invalidate_completeness(self):
+        """Drop the memoized is_complete() result.
+        
+        Call after changing the file slots or unmatched_files; changes that
+        keep every slot filled and the unmatched count the same (e.g. swapping
+        one unmatched file for another) are not detected otherwise.
+        """
+        self._completeness_cache = None
+    
     def is_complete(self) -> bool:
         """Check if patient data is complete."""
         # If manually marked as complete, consider it complete
         if self.manually_complete:
             return True
-            
-        # Count unmatched files, but ignore system files
-        system_files = {'.ds_store', 'thumbs.db', 'desktop.ini'}
-        significant_unmatched = [
-            f for f in self.unmatched_files 
-            if f.filename.lower() not in system_files
-        ]
-        return len(self.get_missing_data_types()) == 0 and len(significant_unmatched) == 0
+        
+        key = self._completeness_key()
+        cached = self._completeness_cache
+        if cached is not None and cached[0] == key and cached[1] is self.unmatched_files:
+            return cached[2]
+        
+        complete = self._compute_is_complete()
+        self._completeness_cache = (key, self.unmatched_files, complete)
+        return complete
+    
+    def _compute_is_complete(self) -> bool:
+        """Evaluate completeness from the current file assignments."""
+        # Any unmatched file that is not a system file makes the patient incomplete
+        if any(f.filename.lower() not in _SYSTEM_FILES for f in self.unmatched_files):
+            return False
+        return self._has_all_required()
 
-@dataclass
+@dataclass(slots=True)
 class ProjectData:
     """Represents the entire project with all patients."""
     root_path: str
@@ -125,3 +207,7 @@ class ProjectData:
     def get_complete_patients(self) -> List[PatientData]:
         """Get list of patients with complete data."""
         return [p for p in self.patients if p.is_complete()]
+    
+    def count_complete(self) -> int:
+        """Count patients with complete data without building a list."""
+        return sum(1 for p in self.patients if p.is_complete())
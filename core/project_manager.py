@@ -3,8 +3,10 @@ Project manager for handling the overall analysis and management of dental data.
 """
 
 import os
-from typing import List, Callable, Optional
+import time
+from typing import List, Callable, Optional, Dict
 import threading
+from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 
@@ -15,19 +17,81 @@ from .cbct_converter import CBCTConverter
 class ProjectManager:
     """Manages the analysis and processing of dental data projects."""
     
-    def __init__(self):
+    # PatientData list attributes that collect multiple files of a type
+    LIST_SLOTS = {
+        DataType.CBCT_DICOM: 'cbct_files',
+        DataType.INTRAORAL_PHOTO: 'intraoral_photos'
+    }
+    
+    # PatientData attributes that hold a single file of a type
+    SINGLE_SLOTS = {
+        DataType.IOS_UPPER: 'ios_upper',
+        DataType.IOS_LOWER: 'ios_lower',
+        DataType.TELERADIOGRAPHY: 'teleradiography',
+        DataType.ORTHOPANTOMOGRAPHY: 'orthopantomography'
+    }
+    
+    # Where excluded files are kept, by extension (anything else is unmatched)
+    EXCLUDED_FILE_SLOTS = {
+        '.dcm': 'cbct_files',
+        '.dicom': 'cbct_files',
+        '.stl': 'unmatched_files',
+        '.jpg': 'intraoral_photos',
+        '.jpeg': 'intraoral_photos',
+        '.png': 'intraoral_photos',
+        '.bmp': 'intraoral_photos'
+    }
+    
+    def __init__(self, exists_check_ttl: float = 0.0):
+        """
+        Args:
+            exists_check_ttl: Seconds to trust a previous os.path.exists() check
+                on a file when it is reassigned again. 0 (the default) always
+                re-checks, since files may vanish mid-session.
+        """
         self.file_analyzer = FileAnalyzer()
         self.cbct_converter = CBCTConverter()
-        self.project_data: Optional[ProjectData] = None
+        self._project_data: Optional[ProjectData] = None
+        self._patient_index: Dict[str, PatientData] = {}
+        self.exists_check_ttl = exists_check_ttl
         self._analysis_callbacks: List[Callable] = []
         self.logger = logging.getLogger(__name__)
     
+    @property
+    def project_data(self) -> Optional[ProjectData]:
+        """Currently loaded project."""
+        return self._project_data
+    
+    @project_data.setter
+    def project_data(self, value: Optional[ProjectData]):
+        # Replacing the project invalidates the patient index
+        self._project_data = value
+        self._patient_index = {}
+    
+    def _rebuild_patient_index(self):
+        """Rebuild the patient_id -> PatientData index from the project data."""
+        self._patient_index = {}
+        if self._project_data:
+            for patient in self._project_data.patients:
+                self._patient_index.setdefault(patient.patient_id, patient)
+    
     def add_analysis_callback(self, callback: Callable):
         """Add a callback to be called during analysis progress."""
         self._analysis_callbacks.append(callback)
     
-    def analyze_project(self, root_path: str, progress_callback: Optional[Callable] = None) -> ProjectData:
-        """Analyze the entire project structure."""
+    def analyze_project(self, root_path: str, progress_callback: Optional[Callable] = None,
+                        max_workers: Optional[int] = None) -> ProjectData:
+        """Analyze the entire project structure.
+        
+        Patient folders are analyzed concurrently since the scan is dominated by
+        file-system and DICOM header I/O. The CBCT conversion and zip packaging
+        each analysis ends with are limited to one per core by FileAnalyzer.
+        
+        Args:
+            root_path: Root folder containing one subfolder per patient
+            progress_callback: Optional callback(current, total, message)
+            max_workers: Number of worker threads (defaults to min(32, cpu_count * 4))
+        """
         self.project_data = ProjectData(root_path=root_path)
         
         if not os.path.exists(root_path):
@@ -41,22 +105,43 @@ class ProjectManager:
             self.project_data.global_errors.append("No patient folders found in the specified directory")
             return self.project_data
         
-        # Analyze each patient folder
+        # Analyze patient folders in parallel
         total_patients = len(patient_folders)
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
         
-        for i, folder_path in enumerate(patient_folders):
-            try:
-                patient_data = self.file_analyzer.analyze_patient_folder(folder_path)
-                self.project_data.patients.append(patient_data)
-                
-                if progress_callback:
-                    progress_callback(i + 1, total_patients, f"Analyzed patient: {patient_data.patient_id}")
+        results: List[Optional[PatientData]] = [None] * total_patients
+        completed = 0
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total_patients))) as pool:
+            futures = {
+                pool.submit(self.file_analyzer.analyze_patient_folder, folder_path): i
+                for i, folder_path in enumerate(patient_folders)
+            }
+            
+            for future in as_completed(futures):
+                i = futures[future]
+                folder_path = patient_folders[i]
                 
-            except Exception as e:
-                error_msg = f"Error analyzing patient folder {folder_path}: {str(e)}"
-                self.project_data.global_errors.append(error_msg)
-                if progress_callback:
-                    progress_callback(i + 1, total_patients, f"Error analyzing: {os.path.basename(folder_path)}")
+                # as_completed() yields on this thread, so bookkeeping and
+                # progress callbacks never run concurrently
+                completed += 1
+                try:
+                    patient_data = future.result()
+                    results[i] = patient_data
+                    self._patient_index.setdefault(patient_data.patient_id, patient_data)
+                    
+                    if progress_callback:
+                        progress_callback(completed, total_patients, f"Analyzed patient: {patient_data.patient_id}")
+                    
+                except Exception as e:
+                    error_msg = f"Error analyzing patient folder {folder_path}: {str(e)}"
+                    self.project_data.global_errors.append(error_msg)
+                    if progress_callback:
+                        progress_callback(completed, total_patients, f"Error analyzing: {os.path.basename(folder_path)}")
+        
+        # Keep patients in folder order regardless of completion order
+        self.project_data.patients.extend(p for p in results if p is not None)
         
         return self.project_data
     
@@ -80,14 +165,16 @@ class ProjectManager:
         patient_folders = []
         
         try:
-            for item in os.listdir(root_path):
-                item_path = os.path.join(root_path, item)
-                if os.path.isdir(item_path):
-                    # Skip tmp folders - they should not be considered as patient folders
-                    if item.lower() == 'tmp':
-                        continue
-                    # Consider any other subfolder as a potential patient folder
-                    patient_folders.append(item_path)
+            # scandir gets the entry type from the directory read itself,
+            # avoiding a stat() per child (expensive on network shares)
+            with os.scandir(root_path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        # Skip tmp folders - they should not be considered as patient folders
+                        if entry.name.lower() == 'tmp':
+                            continue
+                        # Consider any other subfolder as a potential patient folder
+                        patient_folders.append(entry.path)
         except PermissionError:
             pass
         
@@ -98,10 +185,13 @@ class ProjectManager:
         if not self.project_data:
             return {"error": "No project data available"}
         
+        total_patients = len(self.project_data.patients)
+        complete_patients = self.project_data.count_complete()
+        
         report = {
-            "total_patients": len(self.project_data.patients),
-            "complete_patients": len(self.project_data.get_complete_patients()),
-            "incomplete_patients": len(self.project_data.get_incomplete_patients()),
+            "total_patients": total_patients,
+            "complete_patients": complete_patients,
+            "incomplete_patients": total_patients - complete_patients,
             "global_errors": self.project_data.global_errors,
             "patient_details": []
         }
@@ -131,38 +221,28 @@ class ProjectManager:
         if not self.project_data:
             return False
         
-        # Check if the file actually exists
-        if not os.path.exists(file_path):
-            print(f"Warning: File no longer exists: {file_path}")
-            # File doesn't exist anymore - we should still try to update the cache
-            # but return False to inform the user
-            return False
-        
         # Find the patient
-        patient = None
-        for p in self.project_data.patients:
-            if p.patient_id == patient_id:
-                patient = p
-                break
+        patient = self.get_patient_by_id(patient_id)
+        file_data = patient.find_file(file_path) if patient else None
+        
+        # Check if the file actually exists (a recent successful check may be reused)
+        recently_checked = (
+            file_data is not None and self.exists_check_ttl > 0 and
+            time.monotonic() - file_data.exists_checked_at < self.exists_check_ttl
+        )
+        if not recently_checked:
+            if not os.path.exists(file_path):
+                print(f"Warning: File no longer exists: {file_path}")
+                # File doesn't exist anymore - we should still try to update the cache
+                # but return False to inform the user
+                return False
+            if file_data is not None:
+                file_data.exists_checked_at = time.monotonic()
         
         if not patient:
             print(f"Error: Patient not found: {patient_id}")
             return False
         
-        # Find the file in unmatched files
-        file_data = None
-        for f in patient.unmatched_files:
-            if f.path == file_path:
-                file_data = f
-                break
-        
-        # Also check in other lists
-        if not file_data:
-            for f in patient.get_all_files():
-                if f.path == file_path:
-                    file_data = f
-                    break
-        
         if not file_data:
             print(f"Error: File data not found in patient: {file_path}")
             return False
@@ -182,80 +262,60 @@ class ProjectManager:
     
     def _remove_file_from_patient(self, patient: PatientData, file_data):
         """Remove a file from all patient lists."""
-        if file_data in patient.unmatched_files:
-            patient.unmatched_files.remove(file_data)
-        if file_data in patient.cbct_files:
-            patient.cbct_files.remove(file_data)
-        if file_data in patient.intraoral_photos:
-            patient.intraoral_photos.remove(file_data)
-        if patient.ios_upper == file_data:
+        # Compare by identity: dataclass equality compares every field, and
+        # list.remove/`in` would run it against each element
+        patient.unmatched_files[:] = [f for f in patient.unmatched_files if f is not file_data]
+        patient.cbct_files[:] = [f for f in patient.cbct_files if f is not file_data]
+        patient.intraoral_photos[:] = [f for f in patient.intraoral_photos if f is not file_data]
+        if patient.ios_upper is file_data:
             patient.ios_upper = None
-        if patient.ios_lower == file_data:
+        if patient.ios_lower is file_data:
             patient.ios_lower = None
-        if patient.teleradiography == file_data:
+        if patient.teleradiography is file_data:
             patient.teleradiography = None
-        if patient.orthopantomography == file_data:
+        if patient.orthopantomography is file_data:
             patient.orthopantomography = None
+        patient.unindex_file(file_data)
+        patient.invalidate_completeness()
     
     def _add_file_to_patient(self, patient: PatientData, file_data):
         """Add a file to the appropriate patient list based on its data type."""
-        if file_data.data_type == DataType.EXCLUDE:
+        data_type = file_data.data_type
+        
+        if data_type == DataType.EXCLUDE:
             # Excluded files are kept in their original location but marked as excluded
             # They stay where they were (cbct, ios, intraoral, etc.) but won't be uploaded
-            # Determine where to add based on file extension/characteristics
-            if file_data.path.lower().endswith(('.dcm', '.dicom')):
-                patient.cbct_files.append(file_data)
-            elif file_data.path.lower().endswith('.stl'):
-                # STL files could be IOS - add to unmatched for now
-                patient.unmatched_files.append(file_data)
-            elif file_data.path.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp')):
-                patient.intraoral_photos.append(file_data)
-            else:
-                patient.unmatched_files.append(file_data)
-        elif file_data.data_type == DataType.CBCT_DICOM:
-            patient.cbct_files.append(file_data)
-        elif file_data.data_type == DataType.IOS_UPPER:
+            # Determine where to add based on file extension; STL files could be IOS,
+            # so they go to unmatched for now
+            slot = self.EXCLUDED_FILE_SLOTS.get(file_data.extension, 'unmatched_files')
+            getattr(patient, slot).append(file_data)
+        elif data_type in self.LIST_SLOTS:
+            getattr(patient, self.LIST_SLOTS[data_type]).append(file_data)
+        elif data_type in self.SINGLE_SLOTS:
+            slot = self.SINGLE_SLOTS[data_type]
+            existing = getattr(patient, slot)
             # For manual assignments, check if there's already a file
-            if patient.ios_upper is not None:
+            if existing is not None:
                 # Move existing file to unmatched regardless of its status
                 # This ensures files never disappear when being replaced
-                patient.unmatched_files.append(patient.ios_upper)
-            patient.ios_upper = file_data
-        elif file_data.data_type == DataType.IOS_LOWER:
-            # For manual assignments, check if there's already a file
-            if patient.ios_lower is not None:
-                # Move existing file to unmatched regardless of its status
-                # This ensures files never disappear when being replaced
-                patient.unmatched_files.append(patient.ios_lower)
-            patient.ios_lower = file_data
-        elif file_data.data_type == DataType.INTRAORAL_PHOTO:
-            patient.intraoral_photos.append(file_data)
-        elif file_data.data_type == DataType.TELERADIOGRAPHY:
-            # For manual assignments, check if there's already a file
-            if patient.teleradiography is not None:
-                # Move existing file to unmatched regardless of its status
-                # This ensures files never disappear when being replaced
-                patient.unmatched_files.append(patient.teleradiography)
-            patient.teleradiography = file_data
-        elif file_data.data_type == DataType.ORTHOPANTOMOGRAPHY:
-            # For manual assignments, check if there's already a file
-            if patient.orthopantomography is not None:
-                # Move existing file to unmatched regardless of its status
-                # This ensures files never disappear when being replaced
-                patient.unmatched_files.append(patient.orthopantomography)
-            patient.orthopantomography = file_data
+                patient.unmatched_files.append(existing)
+            setattr(patient, slot, file_data)
         else:
             patient.unmatched_files.append(file_data)
+        patient.index_file(file_data)
+        patient.invalidate_completeness()
     
     def get_patient_by_id(self, patient_id: str) -> Optional[PatientData]:
         """Get patient data by ID."""
         if not self.project_data:
             return None
         
-        for patient in self.project_data.patients:
-            if patient.patient_id == patient_id:
-                return patient
-        return None
+        patient = self._patient_index.get(patient_id)
+        if patient is None:
+            # Patients may have been added to project_data directly; resync once
+            self._rebuild_patient_index()
+            patient = self._patient_index.get(patient_id)
+        return patient
     
     def convert_cbct_to_nifti(self, patient_id: str, progress_callback: Optional[Callable] = None) -> bool:
         """
@@ -273,6 +333,12 @@ class ProjectManager:
             self.logger.error(f"Patient {patient_id} not found")
             return False
         
+        return self._convert_cbct_to_nifti(patient, progress_callback)
+    
+    def _convert_cbct_to_nifti(self, patient: PatientData, progress_callback: Optional[Callable] = None) -> bool:
+        """Convert CBCT DICOM files to NIfTI format for an already resolved patient."""
+        patient_id = patient.patient_id
+        
         if not patient.cbct_files:
             self.logger.warning(f"No CBCT files found for patient {patient_id}")
             return False
@@ -289,8 +355,9 @@ class ProjectManager:
             
             # Perform conversion
             nifti_path = self.cbct_converter.convert_cbct_to_nifti(
-                patient.cbct_folder, 
-                patient.folder_path
+                patient.cbct_folder,
+                patient.patient_id,
+                os.path.dirname(patient.folder_path)
             )
             
             if nifti_path:
@@ -318,12 +385,36 @@ class ProjectManager:
                 progress_callback(f"Error converting CBCT for patient {patient_id}: {e}")
             return False
     
-    def convert_all_cbct_to_nifti(self, progress_callback: Optional[Callable] = None) -> dict:
+    def _list_existing_files(self, paths) -> set:
+        """Return the normalized paths among `paths` that exist as files.
+        
+        Each distinct parent directory is read once with os.scandir instead of
+        stat()ing every path (NIfTI outputs all live in the project tmp folder).
+        """
+        existing = set()
+        for directory in {os.path.dirname(os.path.normpath(p)) for p in paths}:
+            try:
+                with os.scandir(directory or '.') as entries:
+                    existing.update(
+                        os.path.normpath(os.path.join(directory, entry.name))
+                        for entry in entries if entry.is_file()
+                    )
+            except OSError:
+                continue
+        return existing
+    
+    def convert_all_cbct_to_nifti(self, progress_callback: Optional[Callable] = None,
+                                  max_workers: Optional[int] = None) -> dict:
         """
         Convert CBCT DICOM files to NIfTI for all patients with CBCT data.
         
+        Conversions run concurrently; each one spends its time in a separate
+        dcm2niix process, so worker threads are enough to keep several CPUs busy.
+        
         Args:
             progress_callback: Optional callback for progress updates
+            max_workers: Number of concurrent conversions (defaults to the CPU count,
+                         1 runs serially)
             
         Returns:
             Dictionary with conversion results
@@ -348,51 +439,81 @@ class ProjectManager:
                 progress_callback("No patients with CBCT data found")
             return results
         
-        for i, patient in enumerate(patients_with_cbct):
-            try:
-                if progress_callback:
-                    progress_callback(f"Converting CBCT {i+1}/{len(patients_with_cbct)}: {patient.patient_id}")
-                
-                # Skip if already converted
-                if patient.nifti_conversion_status == "completed" and patient.nifti_conversion_path:
-                    if os.path.exists(patient.nifti_conversion_path):
-                        results["skipped"] += 1
-                        results["details"].append({
-                            "patient_id": patient.patient_id,
-                            "status": "skipped",
-                            "reason": "Already converted"
-                        })
-                        continue
-                
-                # Perform conversion
-                success = self.convert_cbct_to_nifti(patient.patient_id, progress_callback)
-                
-                if success:
-                    results["successful_conversions"] += 1
-                    results["details"].append({
-                        "patient_id": patient.patient_id,
-                        "status": "success",
-                        "nifti_path": patient.nifti_conversion_path
-                    })
-                else:
-                    results["failed_conversions"] += 1
+        # Progress callbacks may fire from several worker threads
+        callback_lock = threading.Lock()
+        
+        def report(*args):
+            if progress_callback:
+                with callback_lock:
+                    progress_callback(*args)
+        
+        # Skip patients that are already converted
+        existing_outputs = self._list_existing_files(
+            patient.nifti_conversion_path for patient in patients_with_cbct
+            if patient.nifti_conversion_status == "completed" and patient.nifti_conversion_path
+        )
+        to_convert = []
+        for patient in patients_with_cbct:
+            if patient.nifti_conversion_status == "completed" and patient.nifti_conversion_path:
+                if os.path.normpath(patient.nifti_conversion_path) in existing_outputs:
+                    results["skipped"] += 1
                     results["details"].append({
                         "patient_id": patient.patient_id,
-                        "status": "failed",
-                        "reason": "Conversion failed"
+                        "status": "skipped",
+                        "reason": "Already converted"
                     })
-                    
-            except Exception as e:
+                    continue
+            to_convert.append(patient)
+        
+        def convert(i, patient):
+            report(f"Converting CBCT {i+1}/{len(patients_with_cbct)}: {patient.patient_id}")
+            return self._convert_cbct_to_nifti(patient, report)
+        
+        def record(patient, success=None, error=None):
+            if error is not None:
                 results["failed_conversions"] += 1
                 results["details"].append({
                     "patient_id": patient.patient_id,
                     "status": "error",
-                    "reason": str(e)
+                    "reason": str(error)
+                })
+                self.logger.error(f"Error processing patient {patient.patient_id}: {error}")
+            elif success:
+                results["successful_conversions"] += 1
+                results["details"].append({
+                    "patient_id": patient.patient_id,
+                    "status": "success",
+                    "nifti_path": patient.nifti_conversion_path
+                })
+            else:
+                results["failed_conversions"] += 1
+                results["details"].append({
+                    "patient_id": patient.patient_id,
+                    "status": "failed",
+                    "reason": "Conversion failed"
                 })
-                self.logger.error(f"Error processing patient {patient.patient_id}: {e}")
         
-        if progress_callback:
-            progress_callback(f"CBCT conversion completed: {results['successful_conversions']} successful, {results['failed_conversions']} failed")
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = max(1, min(max_workers, len(to_convert) or 1))
+        
+        if max_workers == 1:
+            for i, patient in enumerate(to_convert):
+                try:
+                    record(patient, success=convert(i, patient))
+                except Exception as e:
+                    record(patient, error=e)
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = {pool.submit(convert, i, patient): patient for i, patient in enumerate(to_convert)}
+                for future in as_completed(futures):
+                    patient = futures[future]
+                    try:
+                        record(patient, success=future.result())
+                    except Exception as e:
+                        record(patient, error=e)
+        
+        report(f"CBCT conversion completed: {results['successful_conversions']} successful, {results['failed_conversions']} failed")
         
         return results
     
@@ -410,17 +531,9 @@ class ProjectManager:
             "failed": 0
         }
         
-        for patient in self.project_data.patients:
-            if patient.cbct_files:
-                status["patients_with_cbct"] += 1
-                
-                if patient.nifti_conversion_status == "pending":
-                    status["pending"] += 1
-                elif patient.nifti_conversion_status == "converting":
-                    status["converting"] += 1
-                elif patient.nifti_conversion_status == "completed":
-                    status["completed"] += 1
-                elif patient.nifti_conversion_status == "failed":
-                    status["failed"] += 1
+        counts = Counter(p.nifti_conversion_status for p in self.project_data.patients if p.cbct_files)
+        status["patients_with_cbct"] = sum(counts.values())
+        for key in ("pending", "converting", "completed", "failed"):
+            status[key] = counts.get(key, 0)
         
         return status
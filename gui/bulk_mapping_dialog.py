@@ -5,13 +5,43 @@ Bulk file mapping dialog for the GUI.
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import List, Optional
-import re
+from itertools import islice
 
 from core.models import PatientData, DataType, MatchStatus, FileData
+from core.classification import classify_filenames
+from core.project_manager import ProjectManager
+
 
 class BulkMappingDialog:
     """Dialog for bulk file mapping operations."""
     
+    # The bulk assignment list holds only the rows scrolled into view so far:
+    # each load adds this many viewport heights, more once the end is visible
+    BULK_LIST_SCREENS_PER_LOAD = 3
+    BULK_LIST_DEFAULT_ROW_HEIGHT = 20
+    
+    # Display names offered in the data type comboboxes
+    NAME_TO_DATA_TYPE = {
+        "CBCT DICOM": DataType.CBCT_DICOM,
+        "IOS Upper": DataType.IOS_UPPER,
+        "IOS Lower": DataType.IOS_LOWER,
+        "Teleradiography": DataType.TELERADIOGRAPHY,
+        "Orthopantomography": DataType.ORTHOPANTOMOGRAPHY,
+        "Intraoral Photo": DataType.INTRAORAL_PHOTO
+    }
+    DATA_TYPE_NAMES = list(NAME_TO_DATA_TYPE)
+    
+    # PatientData attributes receiving each data type (shared with ProjectManager)
+    LIST_SLOTS = ProjectManager.LIST_SLOTS
+    SINGLE_SLOTS = ProjectManager.SINGLE_SLOTS
+    
+    # Most lines shown in the smart mapping results box; older lines of a
+    # large run are dropped before they reach the widget
+    SMART_RESULTS_MAX_LINES = 2000
+    
+    # Delay after the last keystroke before the pattern preview refreshes
+    PREVIEW_DEBOUNCE_MS = 150
+    
     def __init__(self, parent, patient_data: PatientData, callback=None):
         self.parent = parent
         self.patient_data = patient_data
@@ -19,25 +49,34 @@ class BulkMappingDialog:
         self.dialog = None
         self.result = None
         
+        # Lowercased filenames for pattern matching, filled in by the first
+        # search that needs each one (smart mapping matches case-insensitively)
+        self.lower_names = {}
+        
+        # (pattern, matches) of the last search; reset whenever unmatched_files changes
+        self.match_cache = (None, None)
+        
+        # Pending after() id of a debounced pattern preview
+        self.preview_after_id = None
+        
         self.create_dialog()
         
     def create_dialog(self):
         """Create the bulk mapping dialog."""
         self.dialog = tk.Toplevel(self.parent)
         self.dialog.title(f"Bulk Mapping - {self.patient_data.patient_id}")
-        self.dialog.geometry("800x600")
         self.dialog.resizable(True, True)
         
-        # Make dialog modal
-        self.dialog.transient(self.parent)
-        self.dialog.grab_set()
-        
-        # Center dialog
-        self.dialog.update_idletasks()
+        # Size and center the dialog in one geometry call (screen size is
+        # known without flushing pending events)
         x = (self.dialog.winfo_screenwidth() // 2) - (800 // 2)
         y = (self.dialog.winfo_screenheight() // 2) - (600 // 2)
         self.dialog.geometry(f"800x600+{x}+{y}")
         
+        # Make dialog modal
+        self.dialog.transient(self.parent)
+        self.dialog.grab_set()
+        
         self.setup_ui()
         
         # Handle dialog close
@@ -55,21 +94,40 @@ class BulkMappingDialog:
         self.notebook = ttk.Notebook(main_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True, pady=10)
         
-        # Smart auto-mapping tab
-        self.create_smart_mapping_tab()
-        
-        # Pattern mapping tab
-        self.create_pattern_mapping_tab()
+        # Interactive mode walks patient_data.unmatched_files directly
+        self.interactive_index = 0
         
-        # Bulk assignment tab
-        self.create_bulk_assignment_tab()
+        # Widgets refreshed after mapping; None until their tab is built
+        self.bulk_files_tree = None
+        self.current_file_label = None
+        
+        # Smart auto-mapping tab is shown first and built right away; the
+        # other tabs are built the first time they are selected
+        tabs = [
+            ("🎯 Smart Auto-Mapping", self.create_smart_mapping_tab),
+            ("🔍 Pattern Mapping", self.create_pattern_mapping_tab),
+            ("📋 Bulk Assignment", self.create_bulk_assignment_tab),
+            ("🎮 Interactive Mapping", self.create_interactive_mapping_tab),
+        ]
+        self.tab_builders = {}
+        for text, builder in tabs:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=text)
+            self.tab_builders[str(frame)] = (frame, builder)
         
-        # Interactive mapping tab
-        self.create_interactive_mapping_tab()
+        self.build_selected_tab()
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.build_selected_tab())
         
         # Buttons
         self.create_buttons(main_frame)
         
+    def build_selected_tab(self):
+        """Build the selected notebook tab if it has not been built yet."""
+        entry = self.tab_builders.pop(self.notebook.select(), None)
+        if entry:
+            frame, builder = entry
+            builder(frame)
+            
     def create_header(self, parent):
         """Create header with patient info and status."""
         header_frame = ttk.LabelFrame(parent, text="Patient Information")
@@ -82,11 +140,16 @@ class BulkMappingDialog:
         ttk.Label(info_frame, text=f"Patient: {self.patient_data.patient_id}", 
                  font=("Arial", 12, "bold")).pack(anchor=tk.W)
         
-        all_files = self.patient_data.get_all_files()
-        unmatched_count = len(self.patient_data.unmatched_files)
-        matched_count = len(all_files) - unmatched_count
+        # Count from the slots directly instead of building get_all_files()
+        patient = self.patient_data
+        matched_count = (len(patient.cbct_files) + len(patient.intraoral_photos)
+                         + sum(f is not None for f in (patient.ios_upper, patient.ios_lower,
+                                                       patient.teleradiography,
+                                                       patient.orthopantomography)))
+        unmatched_count = len(patient.unmatched_files)
+        total_count = matched_count + unmatched_count
         
-        ttk.Label(info_frame, text=f"Total Files: {len(all_files)} | "
+        ttk.Label(info_frame, text=f"Total Files: {total_count} | "
                                   f"Matched: {matched_count} | "
                                   f"Unmatched: {unmatched_count}").pack(anchor=tk.W)
         
@@ -100,10 +163,8 @@ class BulkMappingDialog:
             ttk.Label(info_frame, text="All required data types present", 
                      foreground="green").pack(anchor=tk.W)
     
-    def create_smart_mapping_tab(self):
+    def create_smart_mapping_tab(self, frame):
         """Create smart auto-mapping tab."""
-        frame = ttk.Frame(self.notebook)
-        self.notebook.add(frame, text="🎯 Smart Auto-Mapping")
         
         # Description
         desc_frame = ttk.LabelFrame(frame, text="Description")
@@ -139,10 +200,8 @@ class BulkMappingDialog:
         smart_scroll = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.smart_results_text.yview)
         self.smart_results_text.configure(yscrollcommand=smart_scroll.set)
         
-    def create_pattern_mapping_tab(self):
+    def create_pattern_mapping_tab(self, frame):
         """Create pattern-based mapping tab."""
-        frame = ttk.Frame(self.notebook)
-        self.notebook.add(frame, text="🔍 Pattern Mapping")
         
         # Description
         desc_frame = ttk.LabelFrame(frame, text="Description")
@@ -163,6 +222,7 @@ class BulkMappingDialog:
         self.pattern_entry = ttk.Entry(pattern_row, width=30)
         self.pattern_entry.pack(side=tk.LEFT, padx=(10, 5))
         ttk.Button(pattern_row, text="Preview", command=self.preview_pattern).pack(side=tk.LEFT, padx=5)
+        self.pattern_entry.bind("<KeyRelease>", self.schedule_preview)
         
         # Examples
         examples_frame = ttk.Frame(controls_frame)
@@ -199,10 +259,8 @@ class BulkMappingDialog:
         self.pattern_preview_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         preview_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         
-    def create_bulk_assignment_tab(self):
+    def create_bulk_assignment_tab(self, frame):
         """Create bulk assignment tab."""
-        frame = ttk.Frame(self.notebook)
-        self.notebook.add(frame, text="📋 Bulk Assignment")
         
         # Description
         desc_frame = ttk.LabelFrame(frame, text="Description")
@@ -243,20 +301,20 @@ class BulkMappingDialog:
         list_frame = ttk.LabelFrame(frame, text="Files to be Assigned")
         list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        self.bulk_files_listbox = tk.Listbox(list_frame)
-        bulk_list_scroll = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, 
-                                        command=self.bulk_files_listbox.yview)
-        self.bulk_files_listbox.configure(yscrollcommand=bulk_list_scroll.set)
+        self.bulk_files_tree = ttk.Treeview(list_frame, show="tree", selectmode="extended")
+        self.bulk_list_scroll = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, 
+                                             command=self.bulk_files_tree.yview)
+        self.bulk_files_tree.configure(yscrollcommand=self.on_bulk_list_scroll)
+        self.bulk_files_tree.bind("<Configure>", self.on_bulk_list_configure)
+        self.bulk_rows_loaded = 0
         
-        self.bulk_files_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        bulk_list_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.bulk_files_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.bulk_list_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         
         self.update_bulk_file_list()
         
-    def create_interactive_mapping_tab(self):
+    def create_interactive_mapping_tab(self, frame):
         """Create interactive mapping tab."""
-        frame = ttk.Frame(self.notebook)
-        self.notebook.add(frame, text="🎮 Interactive Mapping")
         
         # Description
         desc_frame = ttk.LabelFrame(frame, text="Description")
@@ -324,8 +382,6 @@ class BulkMappingDialog:
         self.interactive_progress_label.pack()
         
         # Initialize interactive mode
-        self.interactive_index = 0
-        self.interactive_files = self.patient_data.unmatched_files[:]
         self.update_interactive_display()
         
     def create_buttons(self, parent):
@@ -340,58 +396,30 @@ class BulkMappingDialog:
         
     def get_data_type_names(self):
         """Get list of data type names for comboboxes."""
-        return [
-            "CBCT DICOM",
-            "IOS Upper", 
-            "IOS Lower",
-            "Teleradiography",
-            "Orthopantomography",
-            "Intraoral Photo"
-        ]
+        return self.DATA_TYPE_NAMES
         
     def get_data_type_from_name(self, name):
         """Convert display name to DataType enum."""
-        mapping = {
-            "CBCT DICOM": DataType.CBCT_DICOM,
-            "IOS Upper": DataType.IOS_UPPER,
-            "IOS Lower": DataType.IOS_LOWER,
-            "Teleradiography": DataType.TELERADIOGRAPHY,
-            "Orthopantomography": DataType.ORTHOPANTOMOGRAPHY,
-            "Intraoral Photo": DataType.INTRAORAL_PHOTO
-        }
-        return mapping.get(name)
+        return self.NAME_TO_DATA_TYPE.get(name)
         
     def run_smart_mapping(self):
         """Run smart auto-mapping."""
-        self.smart_results_text.config(state=tk.NORMAL)
-        self.smart_results_text.delete(1.0, tk.END)
-        
         mappings_made = 0
         files_to_remove = []
         
-        self.smart_results_text.insert(tk.END, "🎯 Starting Smart Auto-Mapping...\n\n")
+        # Collected here and written to the results box in a single insert
+        log_lines = ["🎯 Starting Smart Auto-Mapping...\n\n"]
         
-        for file_data in self.patient_data.unmatched_files:
-            filename_lower = file_data.filename.lower()
-            suggested_type = None
-            
-            # CBCT DICOM detection
-            if self.smart_cbct_var.get() and (
-                filename_lower.endswith('.dcm') or 
-                'slice' in filename_lower or 
-                '3d' in filename_lower or
-                'cbct' in filename_lower):
-                suggested_type = DataType.CBCT_DICOM
-                
-            # STL file patterns
-            elif self.smart_stl_var.get() and filename_lower.endswith('.stl'):
-                if any(keyword in filename_lower for keyword in ['upper', 'max', 'superiore', 'mascella', 'mascellare', 'maxilla', 'maxillari', 'maxillar','maxillary']):
-                    suggested_type = DataType.IOS_UPPER
-                elif any(keyword in filename_lower for keyword in ['lower', 'man', 'inferiore', 'mandibola', 'mandibolar', 'mandible', 'mandibular']):
-                    suggested_type = DataType.IOS_LOWER
-                    
+        map_cbct = self.smart_cbct_var.get()
+        map_stl = self.smart_stl_var.get()
+        
+        files = self.patient_data.unmatched_files
+        names = [f.filename for f in files]
+        suggestions = classify_filenames(names, map_cbct, map_stl)
+        
+        for file_data, filename, suggested_type in zip(files, names, suggestions):
             if suggested_type:
-                self.smart_results_text.insert(tk.END, f"📄 {file_data.filename} → {suggested_type.value}\n")
+                log_lines.append(f"📄 {filename} → {suggested_type.value}\n")
                 
                 file_data.data_type = suggested_type
                 file_data.confidence = 0.8
@@ -401,41 +429,87 @@ class BulkMappingDialog:
                 files_to_remove.append(file_data)
                 mappings_made += 1
         
-        # Remove mapped files
-        for file_data in files_to_remove:
-            self.patient_data.unmatched_files.remove(file_data)
+        # Remove mapped files in one pass (FileData hashes by identity)
+        if files_to_remove:
+            mapped = set(files_to_remove)
+            self.patient_data.unmatched_files[:] = [
+                f for f in self.patient_data.unmatched_files if f not in mapped
+            ]
+            self.patient_data.invalidate_completeness()
             
-        self.smart_results_text.insert(tk.END, f"\n✅ Auto-mapped {mappings_made} files\n")
+        log_lines.append(f"\n✅ Auto-mapped {mappings_made} files\n")
         
         if mappings_made == 0:
-            self.smart_results_text.insert(tk.END, "ℹ️ No files could be auto-mapped.\n")
+            log_lines.append("ℹ️ No files could be auto-mapped.\n")
+            
+        if len(log_lines) > self.SMART_RESULTS_MAX_LINES:
+            omitted = len(log_lines) - self.SMART_RESULTS_MAX_LINES
+            log_lines = [log_lines[0], f"… {omitted} earlier lines not shown\n"] + \
+                        log_lines[-self.SMART_RESULTS_MAX_LINES:]
             
+        self.smart_results_text.config(state=tk.NORMAL)
+        self.smart_results_text.delete(1.0, tk.END)
+        self.smart_results_text.insert(tk.END, "".join(log_lines))
         self.smart_results_text.config(state=tk.DISABLED)
         
         # Update other tabs
-        self.update_bulk_file_list()
-        self.interactive_files = self.patient_data.unmatched_files[:]
-        self.interactive_index = 0
-        self.update_interactive_display()
-        
+        self.refresh_after_mapping(files_to_remove)
+        
+    def schedule_preview(self, event=None):
+        """Refresh the pattern preview once typing pauses."""
+        self.cancel_scheduled_preview()
+        self.preview_after_id = self.dialog.after(self.PREVIEW_DEBOUNCE_MS, self.preview_pattern)
+        
+    def cancel_scheduled_preview(self):
+        """Cancel a pending debounced preview, if any."""
+        if self.preview_after_id is not None:
+            self.dialog.after_cancel(self.preview_after_id)
+            self.preview_after_id = None
+            
     def preview_pattern(self):
         """Preview files matching the current pattern."""
+        self.cancel_scheduled_preview()
         pattern = self.pattern_entry.get().strip().lower()
+        tree = self.pattern_preview_tree
+        
+        # Clear previous results in a single call
+        children = tree.get_children()
+        if children:
+            tree.delete(*children)
+            
         if not pattern:
             return
             
-        # Clear previous results
-        for item in self.pattern_preview_tree.get_children():
-            self.pattern_preview_tree.delete(item)
+        rows = [(f.filename, (f.path,)) for f in self.find_matching_files(pattern)]
+        
+        insert = tree.insert
+        for filename, values in rows:
+            insert("", "end", text=filename, values=values)
+    
+    def find_matching_files(self, pattern: str) -> List[FileData]:
+        """Return unmatched files whose lowercased name contains pattern.
+        
+        When the previous pattern is a substring of this one (e.g. the user
+        extended "upp" to "upper"), only its matches can still match, so
+        those are filtered instead of the full unmatched list.
+        """
+        last_pattern, last_matches = self.match_cache
+        if last_pattern is not None and last_pattern in pattern:
+            candidates = last_matches
+        else:
+            candidates = self.patient_data.unmatched_files
             
+        lower_names = self.lower_names
         matching_files = []
-        for file_data in self.patient_data.unmatched_files:
-            if pattern in file_data.filename.lower():
+        for file_data in candidates:
+            name = lower_names.get(file_data)
+            if name is None:
+                name = lower_names[file_data] = file_data.filename.lower()
+            if pattern in name:
                 matching_files.append(file_data)
                 
-        for file_data in matching_files:
-            self.pattern_preview_tree.insert("", "end", text=file_data.filename, 
-                                            values=(file_data.path,))
+        self.match_cache = (pattern, matching_files)
+        return matching_files
     
     def run_pattern_mapping(self):
         """Run pattern-based mapping."""
@@ -452,10 +526,7 @@ class BulkMappingDialog:
             return
             
         # Find matching files
-        matching_files = []
-        for file_data in self.patient_data.unmatched_files:
-            if pattern in file_data.filename.lower():
-                matching_files.append(file_data)
+        matching_files = self.find_matching_files(pattern)
                 
         if not matching_files:
             messagebox.showinfo("No Matches", f"No files found matching pattern '{pattern}'")
@@ -474,16 +545,18 @@ class BulkMappingDialog:
             file_data.status = MatchStatus.MATCHED
             
             self.assign_file_to_patient(file_data)
-            self.patient_data.unmatched_files.remove(file_data)
+            
+        mapped = set(matching_files)
+        self.patient_data.unmatched_files[:] = [
+            f for f in self.patient_data.unmatched_files if f not in mapped
+        ]
+        self.patient_data.invalidate_completeness()
+        self.refresh_after_mapping(matching_files)
             
         messagebox.showinfo("Success", f"Mapped {len(matching_files)} files to {type_name}")
         
-        # Update displays
+        # Update the preview (the other tabs were refreshed above)
         self.preview_pattern()
-        self.update_bulk_file_list()
-        self.interactive_files = self.patient_data.unmatched_files[:]
-        self.interactive_index = 0
-        self.update_interactive_display()
         
     def run_bulk_assignment(self):
         """Run bulk assignment of all files."""
@@ -510,52 +583,128 @@ class BulkMappingDialog:
         if not result:
             return
             
-        # Assign all files
-        files_to_assign = self.patient_data.unmatched_files[:]
-        for file_data in files_to_assign:
+        # Assign all files in place; assigning never touches unmatched_files
+        unmatched = self.patient_data.unmatched_files
+        count = len(unmatched)
+        for file_data in unmatched:
             file_data.data_type = data_type
             file_data.confidence = 0.7
             file_data.status = MatchStatus.MATCHED
             
             self.assign_file_to_patient(file_data)
-            self.patient_data.unmatched_files.remove(file_data)
             
-        messagebox.showinfo("Success", f"Assigned all {len(files_to_assign)} files to {type_name}")
+        # Every unmatched file was assigned
+        unmatched.clear()
+        self.refresh_after_mapping()
+            
+        messagebox.showinfo("Success", f"Assigned all {count} files to {type_name}")
         
-        # Update displays
-        self.update_bulk_file_list()
-        self.interactive_files = self.patient_data.unmatched_files[:]
-        self.interactive_index = 0
+    def refresh_after_mapping(self, removed_files: Optional[List[FileData]] = None):
+        """Bring caches and tabs up to date after files left unmatched_files.
+        
+        Args:
+            removed_files: Files just removed from unmatched_files, or None
+                to rebuild everything from the current list
+        """
+        self.match_cache = (None, None)
+        
+        if removed_files is None:
+            self.lower_names.clear()
+            self.update_bulk_file_list()
+        else:
+            for file_data in removed_files:
+                self.lower_names.pop(file_data, None)
+            self.remove_bulk_rows(removed_files)
+            
+        self.interactive_index = min(self.interactive_index, len(self.patient_data.unmatched_files))
         self.update_interactive_display()
         
+    def remove_bulk_rows(self, removed_files: List[FileData]):
+        """Delete the loaded bulk list rows of removed files, keeping the rest."""
+        tree = self.bulk_files_tree
+        if tree is None or not removed_files:
+            return
+        iids = [iid for iid in map(self.bulk_row_iid, removed_files) if tree.exists(iid)]
+        if iids:
+            tree.delete(*iids)
+            # Loaded rows are always a prefix of unmatched_files
+            self.bulk_rows_loaded -= len(iids)
+            
+    @staticmethod
+    def bulk_row_iid(file_data: FileData) -> str:
+        """Treeview item id of a file's row in the bulk assignment list."""
+        return str(id(file_data))
+        
     def update_bulk_file_list(self):
         """Update the bulk assignment file list."""
-        self.bulk_files_listbox.delete(0, tk.END)
-        for file_data in self.patient_data.unmatched_files:
-            self.bulk_files_listbox.insert(tk.END, file_data.filename)
+        if self.bulk_files_tree is None:
+            return
+        children = self.bulk_files_tree.get_children()
+        if children:
+            self.bulk_files_tree.delete(*children)
+        self.bulk_rows_loaded = 0
+        self.load_bulk_rows()
+        
+    def load_bulk_rows(self):
+        """Append the next page of unmatched files to the bulk assignment list."""
+        files = self.patient_data.unmatched_files
+        start = self.bulk_rows_loaded
+        end = min(start + self.bulk_rows_per_load(), len(files))
+        
+        insert = self.bulk_files_tree.insert
+        row_iid = self.bulk_row_iid
+        for file_data in islice(files, start, end):
+            insert("", tk.END, iid=row_iid(file_data), text=file_data.filename)
+        self.bulk_rows_loaded = end
+        
+    def bulk_rows_per_load(self) -> int:
+        """Number of rows to add per load: a few viewport heights."""
+        row_height = ttk.Style().lookup("Treeview", "rowheight")
+        try:
+            row_height = int(row_height)
+        except (TypeError, ValueError):
+            row_height = self.BULK_LIST_DEFAULT_ROW_HEIGHT
+        # Before the first layout the widget reports a height of 1
+        height = max(self.bulk_files_tree.winfo_height(), row_height * 25)
+        return (height // row_height) * self.BULK_LIST_SCREENS_PER_LOAD
+        
+    def on_bulk_list_scroll(self, first, last):
+        """Update the scrollbar and load more rows once the end is visible."""
+        self.bulk_list_scroll.set(first, last)
+        if float(last) >= 1.0 and self.bulk_rows_loaded < len(self.patient_data.unmatched_files):
+            self.load_bulk_rows()
+            
+    def on_bulk_list_configure(self, event=None):
+        """Fill newly exposed space when the list is resized."""
+        if (self.bulk_files_tree.yview()[1] >= 1.0
+                and self.bulk_rows_loaded < len(self.patient_data.unmatched_files)):
+            self.load_bulk_rows()
             
     def update_interactive_display(self):
         """Update the interactive mapping display."""
-        if not self.interactive_files:
+        if self.current_file_label is None:
+            return
+        files = self.patient_data.unmatched_files
+        if not files:
             self.current_file_label.config(text="No more files to map")
             self.current_path_label.config(text="")
             self.interactive_progress_label.config(text="Complete!")
             self.interactive_progress.config(value=100)
             return
             
-        if self.interactive_index >= len(self.interactive_files):
+        if self.interactive_index >= len(files):
             self.current_file_label.config(text="All files processed")
             self.current_path_label.config(text="")
             self.interactive_progress_label.config(text="Complete!")
             self.interactive_progress.config(value=100)
             return
             
-        current_file = self.interactive_files[self.interactive_index]
+        current_file = files[self.interactive_index]
         self.current_file_label.config(text=current_file.filename)
         self.current_path_label.config(text=current_file.path)
         
         # Update progress
-        total_files = len(self.interactive_files)
+        total_files = len(files)
         progress = ((self.interactive_index + 1) / total_files) * 100 if total_files > 0 else 100
         self.interactive_progress.config(value=progress)
         self.interactive_progress_label.config(text=f"File {self.interactive_index + 1} of {total_files}")
@@ -568,7 +717,8 @@ class BulkMappingDialog:
             
     def interactive_assign_next(self):
         """Assign current file and go to next."""
-        if not self.interactive_files or self.interactive_index >= len(self.interactive_files):
+        files = self.patient_data.unmatched_files
+        if not files or self.interactive_index >= len(files):
             return
             
         type_value = self.interactive_type_var.get()
@@ -577,29 +727,23 @@ class BulkMappingDialog:
             return
             
         # Convert value to DataType enum
-        data_type = None
-        for dt in DataType:
-            if dt.value == type_value:
-                data_type = dt
-                break
-                
-        if not data_type:
+        try:
+            data_type = DataType(type_value)
+        except ValueError:
             messagebox.showerror("Error", "Invalid data type selected.")
             return
             
         # Assign the file
-        current_file = self.interactive_files[self.interactive_index]
+        current_file = files[self.interactive_index]
         current_file.data_type = data_type
         current_file.confidence = 1.0
         current_file.status = MatchStatus.MATCHED
         
         self.assign_file_to_patient(current_file)
-        self.patient_data.unmatched_files.remove(current_file)
-        self.interactive_files.remove(current_file)
+        files.pop(self.interactive_index)
         
         # Don't increment index since we removed a file
-        self.update_interactive_display()
-        self.update_bulk_file_list()
+        self.refresh_after_mapping([current_file])
         
     def interactive_skip(self):
         """Skip current file."""
@@ -608,27 +752,25 @@ class BulkMappingDialog:
         
     def interactive_finish(self):
         """Finish interactive mapping."""
-        self.interactive_index = len(self.interactive_files)
+        self.interactive_index = len(self.patient_data.unmatched_files)
         self.update_interactive_display()
         
     def assign_file_to_patient(self, file_data):
         """Assign a file to the appropriate patient data attribute."""
-        if file_data.data_type == DataType.CBCT_DICOM:
-            self.patient_data.cbct_files.append(file_data)
-        elif file_data.data_type == DataType.IOS_UPPER:
-            self.patient_data.ios_upper = file_data
-        elif file_data.data_type == DataType.IOS_LOWER:
-            self.patient_data.ios_lower = file_data
-        elif file_data.data_type == DataType.TELERADIOGRAPHY:
-            self.patient_data.teleradiography = file_data
-        elif file_data.data_type == DataType.ORTHOPANTOMOGRAPHY:
-            self.patient_data.orthopantomography = file_data
-        elif file_data.data_type == DataType.INTRAORAL_PHOTO:
-            self.patient_data.intraoral_photos.append(file_data)
+        data_type = file_data.data_type
+        slot = self.LIST_SLOTS.get(data_type)
+        if slot:
+            getattr(self.patient_data, slot).append(file_data)
+        else:
+            slot = self.SINGLE_SLOTS.get(data_type)
+            if slot:
+                setattr(self.patient_data, slot, file_data)
+        self.patient_data.invalidate_completeness()
             
     def on_apply(self):
         """Apply changes and close dialog."""
         self.result = "apply"
+        self.cancel_scheduled_preview()
         if self.callback:
             self.callback()
         self.dialog.destroy()
@@ -636,4 +778,5 @@ class BulkMappingDialog:
     def on_cancel(self):
         """Cancel and close dialog."""
         self.result = "cancel"
+        self.cancel_scheduled_preview()
         self.dialog.destroy()
@@ -5,11 +5,67 @@ Log viewer window for viewing application logs.
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
+import sys
+import re
+import mmap
+import shutil
+import subprocess
+import queue
+import threading
 import logging
-from datetime import datetime
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+
+# Log location written by main.py, resolved once per process
+_LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
+_LOG_FILE = _LOG_DIR / "tf4m_app.log"
 
 class LogViewerWindow:
-    """Window for viewing application logs."""
+    """Window for viewing application logs.
+    
+    The log is indexed by the byte range of every line passing the filters,
+    and only a window of at most MAX_WINDOW_CHUNKS chunks of CHUNK_LINES
+    lines lives in the text widget. Scrolling to either end of the widget
+    slides the window; decoded chunks are kept in a small LRU cache.
+    """
+    
+    LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+    
+    CHUNK_LINES = 1000
+    MAX_WINDOW_CHUNKS = 5
+    CHUNK_CACHE_SIZE = 64
+    
+    # Bytes copied at a time when locating newlines in the mapped log
+    SCAN_BLOCK_SIZE = 4 * 1024 * 1024
+    
+    # How often the Tk thread polls for finished background work
+    DRAIN_INTERVAL_MS = 30
+    
+    # Buffer of the handle chunks are read through; neighbouring chunks
+    # are then usually served from memory while scrolling
+    READ_BUFFER_SIZE = 1024 * 1024
+    
+    # Read size when saving a copy of the log
+    COPY_BUFFER_SIZE = 1024 * 1024
+    
+    # Pause in typing after which the search text is applied
+    RELOAD_DEBOUNCE_MS = 250
+    
+    # "Show" choices: a byte count from the end of the file or a time span back from now
+    SHOW_RANGES = {
+        "All": None,
+        "Last 1MB": 1024 * 1024,
+        "Last 10MB": 10 * 1024 * 1024,
+        "Last 1h": timedelta(hours=1),
+    }
+    
+    # Leading timestamp of every log record (see the formatter in main.py)
+    TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+    TIMESTAMP_LENGTH = 19
     
     def __init__(self, parent):
         self.parent = parent
@@ -21,9 +77,52 @@ class LogViewerWindow:
         self.auto_refresh = tk.BooleanVar(value=False)
         self.refresh_id = None
         
+        # Pending debounced reload and the search text of the last load
+        self.reload_id = None
+        self.loaded_search = ""
+        
+        # Byte offset up to which the log has been read and total lines seen
+        self.last_offset = 0
+        self.total_lines = 0
+        
+        # (st_mtime_ns, st_size) of the log at the last refresh tick
+        self.last_stat = None
+        
+        # Byte ranges of the lines passing the filters, and the compiled filter
+        self.line_starts = array('q')
+        self.line_ends = array('q')
+        self.filter_pattern = None
+        
+        # level filter ("ALL" included) -> (line_starts, line_ends, total_lines,
+        # last_offset) of unsearched whole-file loads, reused when switching back.
+        # index_key is the level the current index is stored under, if any.
+        self.level_index = {}
+        self.index_key = None
+        
+        # Index lines [window_start, window_end) are in the text widget
+        self.window_start = 0
+        self.window_end = 0
+        
+        # chunk id -> decoded lines, least recently used first
+        self.chunk_cache = OrderedDict()
+        
+        # Log handle kept open across reloads and refresh ticks for chunk reads
+        # (Tk thread only; background scans open their own)
+        self.reader = None
+        
+        # Worker threads never touch Tk: they put (handler, args) on ui_queue
+        # and drain_queue() calls the handler on the Tk thread. Only the scan
+        # result of the latest generation is applied.
+        self.ui_queue = queue.Queue()
+        self.index_generation = 0
+        self.indexing = False
+        # Saves and folder launches still running on worker threads
+        self.pending_tasks = 0
+        self.drain_id = None
+        
         # Get log file path
-        self.log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
-        self.log_file = os.path.join(self.log_dir, "tf4m_app.log")
+        self.log_dir = _LOG_DIR
+        self.log_file = _LOG_FILE
         
         # Setup UI and bind close event
         self.setup_ui()
@@ -70,6 +169,14 @@ class LogViewerWindow:
         search_entry = ttk.Entry(filter_frame, textvariable=self.search_var, width=30)
         search_entry.pack(side=tk.LEFT, padx=5)
         search_entry.bind("<Return>", lambda e: self.load_log_file())
+        search_entry.bind("<KeyRelease>", self.schedule_reload)
+        
+        ttk.Label(filter_frame, text="Show:").pack(side=tk.LEFT, padx=5)
+        self.range_var = tk.StringVar(value="All")
+        range_combo = ttk.Combobox(filter_frame, textvariable=self.range_var, values=list(self.SHOW_RANGES),
+                                   width=10, state="readonly")
+        range_combo.pack(side=tk.LEFT, padx=5)
+        range_combo.bind("<<ComboboxSelected>>", lambda e: self.load_log_file())
         
         ttk.Button(filter_frame, text="Search", command=self.load_log_file).pack(side=tk.LEFT, padx=2)
         ttk.Button(filter_frame, text="Clear Filter", command=self.clear_filter).pack(side=tk.LEFT, padx=2)
@@ -88,13 +195,13 @@ class LogViewerWindow:
             insertbackground="white"
         )
         
-        v_scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text_widget.yview)
+        self.v_scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text_widget.yview)
         h_scrollbar = ttk.Scrollbar(text_frame, orient=tk.HORIZONTAL, command=self.text_widget.xview)
         
-        self.text_widget.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.text_widget.configure(yscrollcommand=self.on_text_scroll, xscrollcommand=h_scrollbar.set)
         
         self.text_widget.grid(row=0, column=0, sticky="nsew")
-        v_scrollbar.grid(row=0, column=1, sticky="ns")
+        self.v_scrollbar.grid(row=0, column=1, sticky="ns")
         h_scrollbar.grid(row=1, column=0, sticky="ew")
         
         text_frame.grid_rowconfigure(0, weight=1)
@@ -113,84 +220,494 @@ class LogViewerWindow:
         status_bar = ttk.Label(self.window, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
         status_bar.pack(fill=tk.X, side=tk.BOTTOM)
         
+    def schedule_reload(self, event=None):
+        """Reload with the new search text once typing pauses."""
+        self.cancel_scheduled_reload()
+        # Keys that did not change the text (arrows, Return, ...) need no reload
+        if self.search_var.get() != self.loaded_search:
+            self.reload_id = self.window.after(self.RELOAD_DEBOUNCE_MS, self.load_log_file)
+    
+    def cancel_scheduled_reload(self):
+        """Cancel a pending debounced reload, if any."""
+        if self.reload_id is not None:
+            self.window.after_cancel(self.reload_id)
+            self.reload_id = None
+    
     def load_log_file(self):
         """Load and display the log file."""
-        self.text_widget.config(state=tk.NORMAL)
-        self.text_widget.delete(1.0, tk.END)
+        self.cancel_scheduled_reload()
+        self.loaded_search = self.search_var.get()
+        self.filter_pattern = self.build_filter_pattern()
+        filter_level = self.filter_var.get()
+        whole_file = self.SHOW_RANGES.get(self.range_var.get()) is None
+        self.index_key = filter_level if whole_file and not self.loaded_search else None
         
-        if not os.path.exists(self.log_file):
-            self.text_widget.insert(tk.END, f"Log file not found: {self.log_file}\n")
-            self.text_widget.config(state=tk.DISABLED)
+        # Reading and indexing restart from the beginning of the file
+        self.last_offset = 0
+        self.total_lines = 0
+        self.last_stat = None
+        self.line_starts = array('q')
+        self.line_ends = array('q')
+        self.chunk_cache.clear()
+        self.window_start = 0
+        self.window_end = 0
+        # The file may have been cleared or replaced; reopen it on the next read
+        self.close_reader()
+        
+        try:
+            file_size = self.log_file.stat().st_size
+        except OSError:
+            file_size = None
+        with self.text_edit():
+            self.text_widget.delete("1.0", tk.END)
+            if file_size is None:
+                self.text_widget.insert(tk.END, f"Log file not found: {self.log_file}\n")
+        
+        # Results of a scan still running are no longer wanted
+        self.index_generation += 1
+        self.indexing = False
+        
+        if file_size is None:
+            self.level_index.clear()
             self.status_var.set("Log file not found")
             return
         
+        # A shrunk file was cleared or replaced: no stored index is valid any more
+        if any(entry[3] > file_size for entry in self.level_index.values()):
+            self.level_index.clear()
+        
+        cached = self.level_index.get(self.index_key)
+        if cached is not None:
+            # Reuse the lines indexed earlier for this level; only the tail
+            # written since then is scanned
+            self.line_starts, self.line_ends, self.total_lines, self.last_offset = cached
+            self.edit_window(self.show_tail)
+            if file_size > self.last_offset:
+                self.start_indexing()
+            return
+        
+        self.status_var.set("Loading log file...")
+        self.start_indexing(reset=True)
+    
+    def append_new_lines(self):
+        """Index the lines written since the last read and show them if following the tail."""
+        if self.indexing:
+            return
+        
         try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            filter_level = self.filter_var.get()
-            search_text = self.search_var.get().lower()
+            stat = self.log_file.stat()
+        except OSError:
+            file_size = -1
+        else:
+            # Nothing was written since the last tick
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+            if stat_key == self.last_stat:
+                return
+            self.last_stat = stat_key
+            file_size = stat.st_size
+        
+        # A missing, cleared or replaced file needs a full reload
+        if file_size < self.last_offset:
+            self.load_log_file()
+            return
+        if file_size == self.last_offset:
+            return
+        
+        self.start_indexing()
+    
+    def start_indexing(self, reset=False):
+        """Scan the log from last_offset on a worker thread.
+        
+        The worker only reads and regex-scans the file; its result is picked
+        up by drain_queue() on the Tk thread, which owns all widget updates.
+        A reset scan starts where the selected "Show" range begins instead.
+        """
+        self.index_generation += 1
+        self.indexing = True
+        show_range = self.SHOW_RANGES.get(self.range_var.get()) if reset else None
+        threading.Thread(
+            target=self.index_worker,
+            args=(self.index_generation, reset, self.last_offset, self.filter_pattern, show_range),
+            daemon=True
+        ).start()
+        self.schedule_drain()
+    
+    def index_worker(self, generation, reset, offset, pattern, show_range=None):
+        """Worker thread: index the lines past offset and queue the result."""
+        try:
+            if show_range is not None:
+                offset = self.find_range_start(show_range)
+            result = self.scan_log(offset, pattern)
+        except Exception as e:
+            result = e
+        self.ui_queue.put((self.finish_scan, (generation, reset, result)))
+    
+    def find_range_start(self, show_range):
+        """Return the offset of the first line inside a "Show" range.
+        
+        A byte range seeks back from the end of the file; a time span is
+        binary-searched on the leading timestamps, so either way only a
+        handful of lines are read before the scan. A time span starts at a
+        record, never at the traceback lines of an older one.
+        """
+        with open(self.log_file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if isinstance(show_range, int):
+                return self.line_start_at(f, max(0, size - show_range))
             
-            displayed_lines = 0
-            for line in lines:
-                # Apply level filter
-                if filter_level != "ALL":
-                    if f" - {filter_level} - " not in line:
-                        continue
-                
-                # Apply search filter
-                if search_text and search_text not in line.lower():
-                    continue
-                
-                # Insert line with appropriate tag
-                start_pos = self.text_widget.index(tk.INSERT)
-                self.text_widget.insert(tk.END, line)
-                
-                # Color code by log level
-                for level in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
-                    if f" - {level} - " in line:
-                        end_pos = self.text_widget.index(tk.INSERT)
-                        self.text_widget.tag_add(level, start_pos, end_pos)
-                        break
+            cutoff = datetime.now() - show_range
+            low, high = 0, size
+            while low < high:
+                middle = (low + high) // 2
+                _, stamp = self.first_record_from(f, self.line_start_at(f, middle))
+                if stamp is None or stamp >= cutoff:
+                    high = middle
+                else:
+                    low = middle + 1
+            return self.first_record_from(f, self.line_start_at(f, low))[0]
+    
+    @staticmethod
+    def line_start_at(f, offset):
+        """Return the offset of the first line starting at or after offset."""
+        if offset <= 0:
+            return 0
+        # Stepping back one byte keeps a line that starts exactly at offset
+        f.seek(offset - 1)
+        f.readline()
+        return f.tell()
+    
+    def first_record_from(self, f, offset):
+        """Return (offset, timestamp) of the first record at or after offset.
+        
+        Continuation lines without a timestamp (e.g. tracebacks) are skipped.
+        At EOF the end offset and None are returned.
+        """
+        f.seek(offset)
+        for line in f:
+            try:
+                stamp = datetime.strptime(line[:self.TIMESTAMP_LENGTH].decode('ascii'), self.TIMESTAMP_FORMAT)
+            except (UnicodeDecodeError, ValueError):
+                offset += len(line)
+                continue
+            return offset, stamp
+        return offset, None
+    
+    def scan_log(self, offset, pattern):
+        """Return (starts, ends, line_count, end_offset) for complete lines past offset.
+        
+        The file is memory-mapped for the duration of the scan, so the regex
+        runs over the page cache directly instead of a copy of the file, and
+        no line is decoded here. Newlines are located with a vectorized byte
+        compare; without a filter they alone give the line ranges.
+        """
+        starts = array('q')
+        ends = array('q')
+        with open(self.log_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size <= offset:
+                return starts, ends, 0, offset
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # A partially written last line is left for the next read
+                end = mm.rfind(b'\n', offset) + 1
+                if end <= offset:
+                    return starts, ends, 0, offset
                 
-                # Highlight search text
-                if search_text:
-                    self.highlight_search_text(start_pos, line, search_text)
+                if pattern is not None:
+                    for match in pattern.finditer(mm, offset, end):
+                        starts.append(match.start())
+                        ends.append(match.end())
                 
-                displayed_lines += 1
-            
-            # Scroll to end
-            self.text_widget.see(tk.END)
-            
-            total_lines = len(lines)
-            file_size = os.path.getsize(self.log_file)
-            self.status_var.set(f"Loaded {displayed_lines} of {total_lines} lines | File size: {file_size:,} bytes")
-            
-        except Exception as e:
-            self.text_widget.insert(tk.END, f"Error loading log file: {e}\n")
-            self.status_var.set(f"Error: {e}")
+                # Blocks are copied out of the map so no buffer export outlives it
+                line_ends = array('q')
+                for block_start in range(offset, end, self.SCAN_BLOCK_SIZE):
+                    block = np.frombuffer(mm[block_start:block_start + self.SCAN_BLOCK_SIZE], dtype=np.uint8)
+                    newlines = np.flatnonzero(block == 0x0A).astype(np.int64)
+                    newlines += block_start + 1
+                    line_ends.frombytes(newlines.tobytes())
+        
+        if pattern is None:
+            starts.append(offset)
+            starts.extend(line_ends[:-1])
+            ends = line_ends
         
-        self.text_widget.config(state=tk.DISABLED)
+        return starts, ends, len(line_ends), end
     
-    def highlight_search_text(self, line_start, line, search_text):
-        """Highlight search text in the line."""
-        line_lower = line.lower()
-        start = 0
+    def schedule_drain(self):
+        """Start polling ui_queue unless it is already being polled."""
+        if self.drain_id is None:
+            self.drain_id = self.window.after(self.DRAIN_INTERVAL_MS, self.drain_queue)
+    
+    def drain_queue(self):
+        """Run queued worker results on the Tk thread; keep polling while work is running."""
+        self.drain_id = None
         while True:
-            pos = line_lower.find(search_text, start)
-            if pos == -1:
+            try:
+                handler, args = self.ui_queue.get_nowait()
+            except queue.Empty:
                 break
+            handler(*args)
+        
+        if self.indexing or self.pending_tasks:
+            self.schedule_drain()
+    
+    def finish_scan(self, generation, reset, result):
+        """Apply a finished scan unless a newer load superseded it."""
+        if generation == self.index_generation:
+            self.indexing = False
+            self.apply_scan(reset, result)
+    
+    def apply_scan(self, reset, result):
+        """Add a scan result to the index and update the displayed window."""
+        if isinstance(result, Exception):
+            self.show_error_line(f"Error loading log file: {result}")
+            self.status_var.set(f"Error: {result}")
+            return
+        
+        starts, ends, line_count, end_offset = result
+        matched_before = len(self.line_starts)
+        self.line_starts.extend(starts)
+        self.line_ends.extend(ends)
+        self.total_lines += line_count
+        self.last_offset = end_offset
+        matched = len(self.line_starts)
+        if self.index_key is not None:
+            self.level_index[self.index_key] = (self.line_starts, self.line_ends, self.total_lines, self.last_offset)
+        
+        with self.text_edit():
+            try:
+                if reset:
+                    self.show_tail()
+                else:
+                    # The previously last chunk may have grown
+                    self.chunk_cache.pop(matched_before // self.CHUNK_LINES, None)
+                    
+                    # Only extend the display when the window already reaches the end
+                    if self.window_end == matched_before:
+                        self.append_window_lines(matched)
+                        self.see_last_row()
+                self.update_status()
+            except Exception as e:
+                self.text_widget.insert(tk.END, f"Error loading log file: {e}\n")
+                self.status_var.set(f"Error: {e}")
+    
+    def show_tail(self):
+        """Fill the window with the last chunks of the index, like a tail."""
+        matched = len(self.line_starts)
+        last_chunk_start = (max(matched - 1, 0) // self.CHUNK_LINES) * self.CHUNK_LINES
+        first = max(0, last_chunk_start - (self.MAX_WINDOW_CHUNKS - 1) * self.CHUNK_LINES)
+        self.window_start = self.window_end = first
+        self.append_window_lines(matched)
+        self.see_last_row()
+    
+    def see_last_row(self):
+        """Scroll to the last displayed line, addressed by the Python-side row count."""
+        self.text_widget.see(f"{max(self.window_end - self.window_start, 1)}.0")
+    
+    def show_error_line(self, message):
+        """Append a message line to the (read-only) text widget."""
+        with self.text_edit():
+            self.text_widget.insert(tk.END, message + "\n")
+    
+    @contextmanager
+    def text_edit(self):
+        """Make the read-only text widget editable for one batch of changes."""
+        self.text_widget.config(state=tk.NORMAL)
+        # Park the caret at the top so Tk does not keep it in view through the edits
+        self.text_widget.mark_set(tk.INSERT, "1.0")
+        try:
+            yield
+        finally:
+            self.text_widget.config(state=tk.DISABLED)
+    
+    def build_filter_pattern(self):
+        """Compile the level and search filters into one regex matching whole lines.
+        
+        Both filters are lookaheads at the start of each line, so a single
+        finditer over the raw bytes yields exactly the lines to show. The
+        search is case-insensitive (ASCII letters only, as it runs on bytes).
+        Returns None when nothing is filtered out.
+        """
+        filter_level = self.filter_var.get()
+        search_text = self.search_var.get()
+        if filter_level == "ALL" and not search_text:
+            return None
+        
+        pattern = rb'^'
+        if filter_level != "ALL":
+            pattern += rb'(?=[^\n]* - ' + re.escape(filter_level.encode()) + rb' - )'
+        if search_text:
+            pattern += rb'(?=[^\n]*?(?i:' + re.escape(search_text.encode('utf-8')) + rb'))'
+        return re.compile(pattern + rb'[^\n]*\n', re.MULTILINE)
+    
+    def get_chunk(self, chunk_id):
+        """Return the decoded lines of an index chunk, reading them from disk if not cached."""
+        lines = self.chunk_cache.get(chunk_id)
+        if lines is not None:
+            self.chunk_cache.move_to_end(chunk_id)
+            return lines
+        
+        first = chunk_id * self.CHUNK_LINES
+        last = min(first + self.CHUNK_LINES, len(self.line_starts))
+        if first >= last:
+            return []
+        
+        # One read covers the whole chunk; lines are sliced out of it
+        base = self.line_starts[first]
+        reader = self.get_reader()
+        reader.seek(base)
+        data = reader.read(self.line_ends[last - 1] - base)
+        
+        lines = []
+        for i in range(first, last):
+            raw = data[self.line_starts[i] - base:self.line_ends[i] - base]
+            lines.append(raw.decode('utf-8', errors='replace').rstrip('\r\n') + '\n')
+        
+        self.chunk_cache[chunk_id] = lines
+        if len(self.chunk_cache) > self.CHUNK_CACHE_SIZE:
+            self.chunk_cache.popitem(last=False)
+        return lines
+    
+    def get_reader(self):
+        """Return the buffered handle used for chunk reads, opening it if needed."""
+        if self.reader is None:
+            self.reader = open(self.log_file, 'rb', buffering=self.READ_BUFFER_SIZE)
+        return self.reader
+    
+    def close_reader(self):
+        """Close the chunk read handle, if open."""
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+    
+    def get_lines(self, start, end):
+        """Return decoded lines [start, end) of the index."""
+        lines = []
+        chunk_lines = self.CHUNK_LINES
+        for chunk_id in range(start // chunk_lines, (end - 1) // chunk_lines + 1):
+            chunk_first = chunk_id * chunk_lines
+            chunk = self.get_chunk(chunk_id)
+            lines.extend(chunk[max(start - chunk_first, 0):end - chunk_first])
+        return lines
+    
+    def render_lines(self, lines, first_row):
+        """Insert lines into the text widget starting at the given 1-based row.
+        
+        The lines go in with a single insert; level and search tags are then
+        applied with one tag_add per tag, passing every index range at once.
+        """
+        if not lines:
+            return
+        self.text_widget.insert(f"{first_row}.0", "".join(lines))
+        
+        # level -> [first_row, end_row) runs; consecutive lines share a run
+        level_runs = {level: [] for level in self.LEVELS}
+        
+        row = first_row
+        for line in lines:
+            # Color code by log level
+            for level in self.LEVELS:
+                if f" - {level} - " in line:
+                    runs = level_runs[level]
+                    if runs and runs[-1][1] == row:
+                        runs[-1][1] = row + 1
+                    else:
+                        runs.append([row, row + 1])
+                    break
             
-            # Calculate text widget positions
-            search_start = f"{line_start}+{pos}c"
-            search_end = f"{line_start}+{pos + len(search_text)}c"
-            self.text_widget.tag_add("SEARCH", search_start, search_end)
-            start = pos + len(search_text)
+            row += 1
+        
+        for level, runs in level_runs.items():
+            if runs:
+                ranges = []
+                for start, end in runs:
+                    ranges += (f"{start}.0", f"{end}.0")
+                self.text_widget.tag_add(level, *ranges)
+        
+        search_text = self.search_var.get()
+        if search_text:
+            search_ranges = self.find_search_ranges(search_text, f"{first_row}.0", f"{row}.0")
+            if search_ranges:
+                self.text_widget.tag_add("SEARCH", *search_ranges)
+    
+    def find_search_ranges(self, search_text, start, stop):
+        """Return flat start/end indices of every search hit between two text indices.
+        
+        Tk's own search finds all hits in one call (-all), reporting their
+        positions and, through the count variable, their lengths.
+        """
+        widget = self.text_widget
+        count_var = tk.StringVar(self.window)
+        positions = widget.tk.splitlist(widget.tk.call(
+            str(widget), 'search', '-all', '-nocase', '-count', str(count_var), '--', search_text, start, stop
+        ))
+        if not positions:
+            return []
+        counts = widget.tk.splitlist(widget.getvar(str(count_var)))
+        
+        ranges = []
+        for position, count in zip(positions, counts):
+            ranges.append(position)
+            ranges.append(f"{position}+{count}c")
+        return ranges
+    
+    def append_window_lines(self, end):
+        """Extend the displayed window down to index line end, trimming chunks from the top."""
+        if end <= self.window_end:
+            return
+        self.render_lines(self.get_lines(self.window_end, end), self.window_end - self.window_start + 1)
+        self.window_end = end
+        
+        max_lines = self.MAX_WINDOW_CHUNKS * self.CHUNK_LINES
+        if self.window_end - self.window_start > max_lines:
+            # window_start stays chunk aligned
+            excess = self.window_end - self.window_start - max_lines
+            drop = -(-excess // self.CHUNK_LINES) * self.CHUNK_LINES
+            self.text_widget.delete("1.0", f"{drop + 1}.0")
+            self.window_start += drop
+    
+    def prepend_window_chunk(self):
+        """Show the chunk before the window, trimming chunks from the bottom."""
+        new_start = self.window_start - self.CHUNK_LINES
+        added = self.window_start - new_start
+        self.render_lines(self.get_lines(new_start, self.window_start), 1)
+        self.window_start = new_start
+        
+        max_lines = self.MAX_WINDOW_CHUNKS * self.CHUNK_LINES
+        if self.window_end - self.window_start > max_lines:
+            self.window_end = self.window_start + max_lines
+            self.text_widget.delete(f"{max_lines + 1}.0", "end-1c")
+        
+        # Keep the lines that were on screen in view
+        self.text_widget.yview(f"{added + 1}.0")
+    
+    def on_text_scroll(self, first, last):
+        """Update the scrollbar and slide the window when either end is reached."""
+        self.v_scrollbar.set(first, last)
+        if float(first) <= 0.0 and self.window_start > 0:
+            self.edit_window(self.prepend_window_chunk)
+        elif float(last) >= 1.0 and self.window_end < len(self.line_starts):
+            next_end = min(self.window_end + self.CHUNK_LINES, len(self.line_starts))
+            self.edit_window(lambda: self.append_window_lines(next_end))
+    
+    def edit_window(self, action):
+        """Run a window change with the text widget temporarily editable."""
+        with self.text_edit():
+            action()
+        self.update_status()
+    
+    def update_status(self):
+        """Show which part of the log is displayed."""
+        matched = len(self.line_starts)
+        shown = f"{self.window_start + 1}-{self.window_end}" if matched else "0"
+        show_range = self.range_var.get()
+        scope = "" if self.SHOW_RANGES.get(show_range) is None else f", {show_range}"
+        self.status_var.set(f"Showing lines {shown} of {matched} matching "
+                            f"({self.total_lines} total{scope}) | File size: {self.last_offset:,} bytes")
     
     def clear_filter(self):
         """Clear all filters."""
         self.filter_var.set("ALL")
         self.search_var.set("")
+        self.range_var.set("All")
         self.load_log_file()
     
     def clear_log(self):
@@ -212,22 +729,60 @@ class LogViewerWindow:
         )
         
         if filename:
-            try:
-                import shutil
-                shutil.copy2(self.log_file, filename)
-                messagebox.showinfo("Success", f"Log saved to {filename}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to save log: {e}")
+            self.status_var.set(f"Saving log to {filename}...")
+            self.pending_tasks += 1
+            threading.Thread(target=self.copy_worker, args=(self.log_file, filename), daemon=True).start()
+            self.schedule_drain()
+    
+    def copy_worker(self, source, destination):
+        """Worker thread: copy the log and queue the outcome for the Tk thread."""
+        error = None
+        try:
+            with open(source, 'rb') as src, open(destination, 'wb') as dst:
+                shutil.copyfileobj(src, dst, length=self.COPY_BUFFER_SIZE)
+            shutil.copystat(source, destination)
+        except Exception as e:
+            error = e
+        self.ui_queue.put((self.finish_save, (destination, error)))
+    
+    def finish_save(self, destination, error=None):
+        """Restore the status bar and report the outcome of a background save."""
+        self.pending_tasks -= 1
+        self.update_status()
+        if error is None:
+            messagebox.showinfo("Success", f"Log saved to {destination}", parent=self.window)
+        else:
+            messagebox.showerror("Error", f"Failed to save log: {error}", parent=self.window)
     
     def open_log_folder(self):
         """Open the log folder in file explorer."""
+        if not self.log_dir.exists():
+            messagebox.showerror("Error", f"Log directory not found: {self.log_dir}")
+            return
+        # Launching the file manager can block (e.g. ShellExecute under AV scans)
+        self.pending_tasks += 1
+        threading.Thread(target=self.open_folder_worker, args=(str(self.log_dir),), daemon=True).start()
+        self.schedule_drain()
+    
+    def open_folder_worker(self, path):
+        """Worker thread: hand the folder to the platform's file manager."""
+        error = None
         try:
-            if os.path.exists(self.log_dir):
-                os.startfile(self.log_dir)
+            if sys.platform == 'win32':
+                os.startfile(path)
+            elif sys.platform == 'darwin':
+                subprocess.Popen(['open', path])
             else:
-                messagebox.showerror("Error", f"Log directory not found: {self.log_dir}")
+                subprocess.Popen(['xdg-open', path])
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to open log folder: {e}")
+            error = e
+        self.ui_queue.put((self.finish_open_folder, (error,)))
+    
+    def finish_open_folder(self, error=None):
+        """Report a failure to open the log folder."""
+        self.pending_tasks -= 1
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to open log folder: {error}", parent=self.window)
     
     def toggle_auto_refresh(self):
         """Toggle auto-refresh of log file."""
@@ -238,7 +793,7 @@ class LogViewerWindow:
     
     def start_auto_refresh(self):
         """Start auto-refresh timer."""
-        self.load_log_file()
+        self.append_new_lines()
         self.refresh_id = self.window.after(2000, self.start_auto_refresh)
     
     def stop_auto_refresh(self):
@@ -248,6 +803,11 @@ class LogViewerWindow:
             self.refresh_id = None
     
     def on_closing(self):
-        """Handle window close event - clean up auto-refresh timer."""
+        """Handle window close event - clean up auto-refresh and scan polling."""
         self.stop_auto_refresh()
+        self.cancel_scheduled_reload()
+        if self.drain_id is not None:
+            self.window.after_cancel(self.drain_id)
+            self.drain_id = None
+        self.close_reader()
         self.window.destroy()
@@ -5,17 +5,21 @@ Main window for the Dental Data Management application.
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
-from typing import Optional
+import io
+from typing import Dict, Optional, Tuple
 
 from core.project_manager import ProjectManager
 from core.api_client import TF4MAPIClient, APIClient
 from gui.patient_browser import PatientBrowser
-from gui.settings_dialog import SettingsDialog
 from gui.upload_manager import UploadManager
-from gui.upload_dialog import UploadDialog
-from gui.log_viewer import LogViewerWindow
 import logging
 
+# Settings written by the settings dialog (relative to the working directory)
+_SETTINGS_FILE = "settings.json"
+
+# Settings file path -> ((st_mtime_ns, st_size), parsed settings) of its last read
+_SETTINGS_CACHE: Dict[str, Tuple[Tuple[int, int], dict]] = {}
+
 class MainWindow:
     """Main application window."""
     
@@ -25,6 +29,11 @@ class MainWindow:
         self.api_client = TF4MAPIClient("https://toothfairy4m.ing.unimore.it", project_slug="maxillo")  # Default TF4M URL
         self.logger = logging.getLogger(__name__)
         
+        # Formatted validation report, keyed by the _project_version it was built for
+        self._report_cache: Dict[int, str] = {}
+        # Bumped after every analysis run and every edit made in the patient browser
+        self._project_version = 0
+        
         # Load saved settings and apply to API client
         self.load_and_apply_settings()
         
@@ -139,7 +148,8 @@ class MainWindow:
         self.notebook.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
         
         # Patient browser tab
-        self.patient_browser = PatientBrowser(self.notebook, self.project_manager)
+        self.patient_browser = PatientBrowser(self.notebook, self.project_manager,
+                                              on_project_changed=self.mark_project_changed)
         self.notebook.add(self.patient_browser.frame, text="Patient Browser")
         
         # Upload manager tab
@@ -163,29 +173,49 @@ class MainWindow:
     def load_and_apply_settings(self):
         """Load settings from file and apply them to the API client."""
         import json
-        settings_file = "settings.json"
+        settings_file = _SETTINGS_FILE
         
         # Default settings
         default_settings = {
             "api_url": "https://toothfairy4m.ing.unimore.it",
             "username": "",
-            "password": ""
+            "password": "",
+            "exists_check_ttl": 0.0
         }
         
         try:
-            if os.path.exists(settings_file):
+            # Only re-parse the file when it changed since the last read
+            # (the size catches rewrites within one coarse mtime tick)
+            stat = os.stat(settings_file)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            cached = _SETTINGS_CACHE.get(settings_file)
+            if cached is not None and cached[0] == signature:
+                loaded_settings = cached[1]
+            else:
                 with open(settings_file, 'r') as f:
                     loaded_settings = json.load(f)
-                    default_settings.update(loaded_settings)
+                _SETTINGS_CACHE[settings_file] = (signature, loaded_settings)
+            default_settings.update(loaded_settings)
         except Exception:
-            pass  # Use default settings if loading fails
+            pass  # Use default settings if the file is missing or loading fails
         
-        # Apply settings to API client
-        if default_settings["api_url"]:
-            self.api_client.set_base_url(default_settings["api_url"])
-        
-        if default_settings["username"] and default_settings["password"]:
-            self.api_client.set_credentials(default_settings["username"], default_settings["password"])
+        # Opt-in reuse of recent file existence checks (seconds, 0 = always check)
+        try:
+            self.project_manager.exists_check_ttl = max(0.0, float(default_settings["exists_check_ttl"]))
+        except (TypeError, ValueError):
+            self.project_manager.exists_check_ttl = 0.0
+        
+        # Apply settings to API client; unchanged values are skipped because
+        # setting them drops the authenticated session
+        api_url = default_settings["api_url"]
+        if api_url and api_url.rstrip('/') != self.api_client.base_url:
+            self.api_client.set_base_url(api_url)
+        
+        username = default_settings["username"]
+        password = default_settings["password"]
+        if username and password and (username, password) != (self.api_client.username,
+                                                               self.api_client.password):
+            self.api_client.set_credentials(username, password)
         
     def open_project_folder(self):
         """Open a project folder dialog."""
@@ -227,8 +257,9 @@ class MainWindow:
                 self.progress_var.set("Ready")
                 messagebox.showerror("Analysis Error", f"Failed to analyze project: {error}")
             else:
+                self.mark_project_changed()
                 total_patients = len(result.patients)
-                complete_patients = len(result.get_complete_patients())
+                complete_patients = result.count_complete()
                 self.status_var.set(f"Analysis complete: {total_patients} patients found, {complete_patients} complete")
                 self.progress_var.set("Analysis complete")
                 
@@ -260,6 +291,7 @@ class MainWindow:
             return
         
         # Show upload dialog to get user preferences
+        from gui.upload_dialog import UploadDialog
         upload_dialog = UploadDialog(self.root, all_patients)
         result = upload_dialog.show()
         
@@ -284,8 +316,11 @@ class MainWindow:
             
     def open_settings(self):
         """Open the settings dialog."""
+        from gui.settings_dialog import SettingsDialog
         dialog = SettingsDialog(self.root, self.api_client)
-        # Reload settings after dialog closes to ensure API client has latest credentials
+        # Reload settings after dialog closes to ensure API client has latest credentials;
+        # the dialog may have rewritten the file within the same mtime tick
+        _SETTINGS_CACHE.pop(_SETTINGS_FILE, None)
         self.load_and_apply_settings()
         
     def generate_report(self):
@@ -294,7 +329,11 @@ class MainWindow:
             messagebox.showerror("Error", "No project data available")
             return
             
-        report = self.project_manager.get_validation_report()
+        # Reuse the formatted report while the project is unchanged
+        report_text = self._report_cache.get(self._project_version)
+        if report_text is None:
+            report_text = self._format_report(self.project_manager.get_validation_report())
+            self._report_cache = {self._project_version: report_text}
         
         # Create a new window to display the report
         report_window = tk.Toplevel(self.root)
@@ -312,54 +351,62 @@ class MainWindow:
         text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Format and insert report
-        self._format_report(text_widget, report)
+        # Insert the formatted report in one call
+        text_widget.insert(tk.END, report_text)
         text_widget.config(state=tk.DISABLED)
         
-    def _format_report(self, text_widget, report):
+    def _format_report(self, report) -> str:
         """Format the validation report for display."""
-        text_widget.insert(tk.END, "DENTAL DATA VALIDATION REPORT\n")
-        text_widget.insert(tk.END, "=" * 50 + "\n\n")
+        out = io.StringIO()
+        out.write("DENTAL DATA VALIDATION REPORT\n")
+        out.write("=" * 50 + "\n\n")
         
         # Summary
-        text_widget.insert(tk.END, f"Total Patients: {report['total_patients']}\n")
-        text_widget.insert(tk.END, f"Complete Patients: {report['complete_patients']}\n")
-        text_widget.insert(tk.END, f"Incomplete Patients: {report['incomplete_patients']}\n\n")
+        out.write(f"Total Patients: {report['total_patients']}\n")
+        out.write(f"Complete Patients: {report['complete_patients']}\n")
+        out.write(f"Incomplete Patients: {report['incomplete_patients']}\n\n")
         
         # Global errors
         if report['global_errors']:
-            text_widget.insert(tk.END, "GLOBAL ERRORS:\n")
+            out.write("GLOBAL ERRORS:\n")
             for error in report['global_errors']:
-                text_widget.insert(tk.END, f"  - {error}\n")
-            text_widget.insert(tk.END, "\n")
+                out.write(f"  - {error}\n")
+            out.write("\n")
         
         # Patient details
-        text_widget.insert(tk.END, "PATIENT DETAILS:\n")
-        text_widget.insert(tk.END, "-" * 30 + "\n")
+        out.write("PATIENT DETAILS:\n")
+        out.write("-" * 30 + "\n")
         
         for patient in report['patient_details']:
-            text_widget.insert(tk.END, f"\nPatient: {patient['patient_id']}\n")
-            text_widget.insert(tk.END, f"  Status: {'COMPLETE' if patient['is_complete'] else 'INCOMPLETE'}\n")
+            out.write(f"\nPatient: {patient['patient_id']}\n")
+            out.write(f"  Status: {'COMPLETE' if patient['is_complete'] else 'INCOMPLETE'}\n")
             
             if patient['missing_data_types']:
-                text_widget.insert(tk.END, f"  Missing: {', '.join(patient['missing_data_types'])}\n")
+                out.write(f"  Missing: {', '.join(patient['missing_data_types'])}\n")
                 
             if patient['unmatched_files'] > 0:
-                text_widget.insert(tk.END, f"  Unmatched files: {patient['unmatched_files']}\n")
+                out.write(f"  Unmatched files: {patient['unmatched_files']}\n")
                 
             # File counts
             counts = patient['file_counts']
-            text_widget.insert(tk.END, f"  Files: CBCT({counts['cbct_files']}), ")
-            text_widget.insert(tk.END, f"Photos({counts['intraoral_photos']}), ")
-            text_widget.insert(tk.END, f"IOS Upper({'✓' if counts['has_ios_upper'] else '✗'}), ")
-            text_widget.insert(tk.END, f"IOS Lower({'✓' if counts['has_ios_lower'] else '✗'}), ")
-            text_widget.insert(tk.END, f"Tele({'✓' if counts['has_teleradiography'] else '✗'}), ")
-            text_widget.insert(tk.END, f"Ortho({'✓' if counts['has_orthopantomography'] else '✗'})\n")
+            out.write(f"  Files: CBCT({counts['cbct_files']}), ")
+            out.write(f"Photos({counts['intraoral_photos']}), ")
+            out.write(f"IOS Upper({'✓' if counts['has_ios_upper'] else '✗'}), ")
+            out.write(f"IOS Lower({'✓' if counts['has_ios_lower'] else '✗'}), ")
+            out.write(f"Tele({'✓' if counts['has_teleradiography'] else '✗'}), ")
+            out.write(f"Ortho({'✓' if counts['has_orthopantomography'] else '✗'})\n")
             
             if patient['validation_errors']:
-                text_widget.insert(tk.END, "  Errors:\n")
+                out.write("  Errors:\n")
                 for error in patient['validation_errors']:
-                    text_widget.insert(tk.END, f"    - {error}\n")
+                    out.write(f"    - {error}\n")
+        
+        return out.getvalue()
+    
+    def mark_project_changed(self):
+        """Record that the project data changed, so the next report is rebuilt."""
+        self._project_version += 1
+        self._report_cache.clear()
                     
     def show_about(self):
         """Show about dialog."""
@@ -378,6 +425,8 @@ Developed for TF4M"""
     def show_log_viewer(self):
         """Show the console log viewer window."""
         try:
+            # Imported on first use; the viewer pulls in numpy
+            from gui.log_viewer import LogViewerWindow
             LogViewerWindow(self.root)
         except Exception as e:
             self.logger.error(f"Failed to open log viewer: {e}")
@@ -4,22 +4,132 @@ Patient browser widget for viewing and managing patient data.
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import Optional, List
+from typing import Callable, Optional, List
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import os
+import queue
+
+try:
+    from PIL import Image, ImageTk
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
 
 from core.models import ProjectData, PatientData, DataType
+from core.classification import classify_filenames
 from core.project_manager import ProjectManager
 from .bulk_mapping_dialog import BulkMappingDialog
 
+# File extensions shown with an image preview (DICOM/STL never match)
+_IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.tif', '.webp'})
+
+
+@lru_cache(maxsize=4096)
+def is_image_file(file_path: str) -> bool:
+    """Check if file is a supported image format (excluding DICOM/STL)."""
+    return os.path.splitext(file_path)[1].lower() in _IMAGE_EXTENSIONS
+
+
+# Where a patient's files are held, in removal lookup order:
+# (PatientData attribute, holds a list, name shown to the user)
+_FILE_SLOTS = (
+    ('unmatched_files', True, "Unmatched files"),
+    ('cbct_files', True, "CBCT files"),
+    ('ios_upper', False, "IOS Upper scan"),
+    ('ios_lower', False, "IOS Lower scan"),
+    ('intraoral_photos', True, "Intraoral photos"),
+    ('teleradiography', False, "Teleradiography"),
+    ('orthopantomography', False, "Orthopantomography (Panoramic)"),
+)
+
+
+# Completeness overview rows: data type -> (count/file getter, details when
+# present, details when missing). The getter returns the number of files and,
+# for single-file slots, the file itself.
+_OVERVIEW_ROWS = {
+    DataType.CBCT_DICOM: (lambda p: (len(p.cbct_files), None),
+                          "{count} DICOM files found", "No CBCT DICOM files detected"),
+    DataType.IOS_UPPER: (lambda p: (1 if p.ios_upper else 0, p.ios_upper),
+                         "File: {filename}", "No upper jaw scan found"),
+    DataType.IOS_LOWER: (lambda p: (1 if p.ios_lower else 0, p.ios_lower),
+                         "File: {filename}", "No lower jaw scan found"),
+    DataType.TELERADIOGRAPHY: (lambda p: (1 if p.teleradiography else 0, p.teleradiography),
+                               "File: {filename}", "No teleradiography found"),
+    DataType.ORTHOPANTOMOGRAPHY: (lambda p: (1 if p.orthopantomography else 0, p.orthopantomography),
+                                  "File: {filename}", "No orthopantomography found"),
+    DataType.INTRAORAL_PHOTO: (lambda p: (len(p.intraoral_photos), None),
+                               "{count} intraoral photos found", "No intraoral photos (optional)"),
+}
+
+
 class PatientBrowser:
     """Widget for browsing and managing patient data."""
     
-    def __init__(self, parent, project_manager: ProjectManager):
+    # Data types a patient needs to be complete (intraoral photos are optional)
+    REQUIRED_DATA_TYPES = frozenset({
+        DataType.CBCT_DICOM,
+        DataType.IOS_UPPER,
+        DataType.IOS_LOWER,
+        DataType.TELERADIOGRAPHY,
+        DataType.ORTHOPANTOMOGRAPHY
+    })
+    
+    # Pause in typing after which the text filter is applied
+    FILTER_DEBOUNCE_MS = 250
+    # Shorter text filters barely narrow the full list and are treated as empty
+    # when no status filter is set
+    FILTER_MIN_LENGTH = 2
+    
+    # Tcl procedure appending many rows under one parent in a single call; returns the new item ids
+    INSERT_ROWS_PROC = "::patient_browser::insert_rows"
+    INSERT_ROWS_SCRIPT = """
+namespace eval ::patient_browser {}
+proc ::patient_browser::insert_rows {tree parent rows} {
+    set items {}
+    foreach {text values tags image} $rows {
+        lappend items [$tree insert $parent end -text $text -values $values -tags $tags -image $image]
+    }
+    return $items
+}
+"""
+    
+    # Default number of thumbnails kept alive (each holds decoded pixels in Tk)
+    THUMBNAIL_CACHE_SIZE = 200
+    THUMBNAIL_SIZE = (100, 70)
+    # Row heights of the files tree with and without image previews
+    FILES_ROW_HEIGHT = 25
+    FILES_PREVIEW_ROW_HEIGHT = 80
+    # Delay coalescing scroll/resize events before visible thumbnails are loaded
+    THUMBNAIL_LOAD_DELAY_MS = 50
+    # Background threads decoding thumbnails
+    THUMBNAIL_WORKERS = 4
+    # Poll interval of the Tk thread while thumbnails are being decoded
+    THUMBNAIL_DRAIN_INTERVAL_MS = 30
+    
+    def __init__(self, parent, project_manager: ProjectManager, thumbnail_cache_size: Optional[int] = None,
+                 on_project_changed: Optional[Callable[[], None]] = None):
         self.parent = parent
         self.project_manager = project_manager
+        # Called after every edit of the project data made from this browser
+        self.on_project_changed = on_project_changed
+        self.thumbnail_cache_size = thumbnail_cache_size or self.THUMBNAIL_CACHE_SIZE
         self.project_data: Optional[ProjectData] = None
         self.current_patient: Optional[PatientData] = None
         self.data_type_labels = {}  # Initialize dictionary for completeness overview
+        # label -> options it was last configured with by update_completeness_overview
+        self.shown_label_options = {}
+        self.filter_after_id = None
+        # patient_id -> patient tree item, and the (values, tags) last shown for it
+        self.tree_items = {}
+        self.row_cache = {}
+        # patient_id -> get_patient_stats() result
+        self.stats_cache = {}
+        # (patient, lowercase patient_id) in project order, for the text filter
+        self.patient_search_keys = []
+        # (text_filter, status_filter) the patient list currently shows
+        self.shown_filter = None
         
         self.setup_ui()
         
@@ -51,7 +161,7 @@ class PatientBrowser:
         
         ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT)
         self.filter_var = tk.StringVar()
-        self.filter_var.trace('w', self.filter_patients)
+        self.filter_var.trace('w', self.schedule_filter)
         filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_var)
         filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
         
@@ -89,6 +199,12 @@ class PatientBrowser:
         self.patient_tree.column("status", width=80)
         self.patient_tree.column("missing", width=60)
         self.patient_tree.column("files", width=60)
+        self.patient_tree.tk.eval(self.INSERT_ROWS_SCRIPT)
+        
+        # Configure tags for visual styling
+        self.patient_tree.tag_configure("complete", foreground="green")
+        self.patient_tree.tag_configure("incomplete", foreground="orange")
+        self.patient_tree.tag_configure("manual", foreground="blue")
         
         # Scrollbar for treeview
         tree_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.patient_tree.yview)
@@ -202,20 +318,38 @@ class PatientBrowser:
         
         # Configure styles for adaptive row heights
         style = ttk.Style()
-        style.configure("FilesPreview.Treeview", rowheight=25)  # Default compact height
+        style.configure("FilesPreview.Treeview", rowheight=self.FILES_ROW_HEIGHT)  # Default compact height
         self.files_tree.configure(style="FilesPreview.Treeview")
-        
-        # Image cache to prevent garbage collection
-        self.image_cache = {}
+        self.files_row_height = self.FILES_ROW_HEIGHT
+        
+        # Thumbnail cache (least recently used first); also prevents garbage collection
+        self.image_cache = OrderedDict()
+        # Image rows of the shown patient (item -> path) and the Tk image each row shows
+        self.image_rows = {}
+        self.row_images = {}
+        self.pending_group_files = {}
+        self.thumbnail_after_id = None
+        # Thumbnails being decoded in the background (cache key -> rows waiting for it)
+        self.pending_thumbnails = {}
+        self.thumbnail_futures = {}
+        self.thumbnail_failures = set()
+        self.thumbnail_pool = ThreadPoolExecutor(max_workers=self.THUMBNAIL_WORKERS)
+        # Workers report finished decodes as (cache key, future) through thumbnail_queue;
+        # drain_thumbnail_queue() picks them up on the Tk thread
+        self.thumbnail_queue = queue.Queue()
+        self.thumbnail_drain_id = None
+        # Shown on image rows until their thumbnail is decoded
+        self.placeholder_thumbnail = tk.PhotoImage(width=self.THUMBNAIL_SIZE[0], height=self.THUMBNAIL_SIZE[1])
+        self.placeholder_thumbnail.put("#f8f8f8", to=(0, 0) + self.THUMBNAIL_SIZE)
         
         # Scrollbars
-        files_v_scroll = ttk.Scrollbar(tree_container, orient=tk.VERTICAL, command=self.files_tree.yview)
+        self.files_v_scroll = ttk.Scrollbar(tree_container, orient=tk.VERTICAL, command=self.files_tree.yview)
         files_h_scroll = ttk.Scrollbar(tree_container, orient=tk.HORIZONTAL, command=self.files_tree.xview)
-        self.files_tree.configure(yscrollcommand=files_v_scroll.set, xscrollcommand=files_h_scroll.set)
+        self.files_tree.configure(yscrollcommand=self.on_files_tree_scroll, xscrollcommand=files_h_scroll.set)
         
         # Pack widgets
         self.files_tree.grid(row=0, column=0, sticky="nsew")
-        files_v_scroll.grid(row=0, column=1, sticky="ns")
+        self.files_v_scroll.grid(row=0, column=1, sticky="ns")
         files_h_scroll.grid(row=1, column=0, sticky="ew")
         
         tree_container.grid_rowconfigure(0, weight=1)
@@ -230,6 +364,34 @@ class PatientBrowser:
         self.files_tree.bind("<Button-3>", self.show_files_context_menu)
         self.files_tree.bind("<Double-1>", self.on_file_double_click)
         
+        # Thumbnails are created only for rows that come into view
+        self.files_tree.bind("<Configure>", self.schedule_thumbnail_load)
+        self.files_tree.bind("<<TreeviewOpen>>", self.on_files_group_open)
+        # Stop the decode workers with the window, so queued decodes don't delay exit
+        self.files_tree.bind("<Destroy>", self.shutdown_thumbnails)
+        
+    def on_files_tree_scroll(self, first, last):
+        """Update the scrollbar and load thumbnails of rows scrolled into view."""
+        self.files_v_scroll.set(first, last)
+        self.schedule_thumbnail_load()
+        
+    def schedule_thumbnail_load(self, event=None):
+        """Load the visible thumbnails shortly, once per burst of scroll/resize events."""
+        if self.thumbnail_after_id is None and self.image_rows:
+            self.thumbnail_after_id = self.files_tree.after(self.THUMBNAIL_LOAD_DELAY_MS, self.load_visible_thumbnails)
+        
+    def load_visible_thumbnails(self):
+        """Show thumbnails on the image rows currently on screen."""
+        self.thumbnail_after_id = None
+        tree = self.files_tree
+        
+        # Every row is files_row_height tall, so sampling at that step hits each visible row
+        for y in range(0, tree.winfo_height(), self.files_row_height):
+            item = tree.identify_row(y)
+            file_path = self.image_rows.get(item)
+            if file_path is not None:
+                self.request_thumbnail(item, file_path)
+        
     def on_file_double_click(self, event):
         """Handle double-click on file items."""
         item = self.files_tree.selection()[0] if self.files_tree.selection() else None
@@ -242,29 +404,18 @@ class PatientBrowser:
             file_path = values[1]  # Path is second column
             
             # Check if it's an image file
-            if file_path and self.is_image_file(file_path):
+            if file_path and is_image_file(file_path):
                 self.show_image_preview(file_path)
             else:
                 self.open_file()  # Default file opening behavior
     
-    def is_image_file(self, file_path):
-        """Check if file is a supported image format (excluding DICOM/STL)."""
-        file_lower = file_path.lower()
-        
-        # Skip DICOM and STL files
-        if file_lower.endswith('.dcm') or file_lower.endswith('.stl'):
-            return False
-            
-        # Check for supported image formats
-        supported_formats = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.tif')
-        return any(file_lower.endswith(fmt) for fmt in supported_formats)
-    
     def show_image_preview(self, file_path):
         """Show a larger preview of an image file."""
-        try:
-            from PIL import Image, ImageTk
-            import os
+        if not PIL_AVAILABLE:
+            messagebox.showerror("Error", "Image preview requires the Pillow package.")
+            return
             
+        try:
             if not os.path.exists(file_path):
                 messagebox.showerror("Error", "File not found!")
                 return
@@ -283,6 +434,8 @@ class PatientBrowser:
             
             # Calculate size to fit window while preserving aspect ratio
             max_size = (750, 550)
+            if image.format == 'JPEG':
+                image.draft('RGB', max_size)
             image.thumbnail(max_size, Image.Resampling.LANCZOS)
             
             photo = ImageTk.PhotoImage(image)
@@ -388,6 +541,11 @@ class PatientBrowser:
         """Create the conflicts/issues tab."""
         conflicts_frame = ttk.Frame(self.details_notebook)
         self.details_notebook.add(conflicts_frame, text="Issues")
+        self.issues_frame = conflicts_frame
+        
+        # The issues text is built only while the tab is shown
+        self.issues_dirty = False
+        self.details_notebook.bind('<<NotebookTabChanged>>', lambda e: self.refresh_issues_text())
         
         # Issues text widget
         self.issues_text = tk.Text(conflicts_frame, wrap=tk.WORD, state=tk.DISABLED)
@@ -400,24 +558,37 @@ class PatientBrowser:
     def load_project_data(self, project_data: ProjectData):
         """Load project data into the browser."""
         self.project_data = project_data
+        
+        # Rows of the previous project are not reused
+        self.patient_tree.delete(*self.patient_tree.get_children())
+        is_image_file.cache_clear()
+        self.tree_items = {}
+        self.row_cache = {}
+        self.stats_cache = {}
+        # Lowercased once here rather than on every filter pass
+        self.patient_search_keys = [(p, p.patient_id.lower()) for p in project_data.patients] if project_data else []
+        
         self.populate_patient_list()
         
     def populate_patient_list(self):
         """Populate the patient list."""
-        # Clear existing items
-        for item in self.patient_tree.get_children():
-            self.patient_tree.delete(item)
-            
-        if not self.project_data:
-            return
-            
-        for patient in self.project_data.patients:
-            is_complete = patient.is_complete()
-            missing_count = len(patient.get_missing_data_types())
-            total_files = len(patient.get_all_files())
+        self.shown_filter = ("", "all")
+        self.render_patient_rows()
+    
+    def render_patient_rows(self, predicate=None):
+        """Show the patients of the project, in project order.
+        
+        predicate(patient_id_lower, is_complete) selects the patients to show;
+        all of them are shown when it is None.
+        """
+        visible_rows = []
+        for patient, patient_id_lower in self.patient_search_keys:
+            is_complete, missing_count, total_files, manually_complete = self.get_patient_stats(patient)
+            if predicate is not None and not predicate(patient_id_lower, is_complete):
+                continue
             
             # Determine status text and tag
-            if patient.manually_complete:
+            if manually_complete:
                 status_text = "✓M"  # M for Manual
                 status = "manual"
             elif is_complete:
@@ -427,71 +598,135 @@ class PatientBrowser:
                 status_text = "⚠"
                 status = "incomplete"
             
-            self.patient_tree.insert(
-                "", 
-                tk.END, 
-                text=patient.patient_id,
-                values=(status_text, missing_count, total_files),
-                tags=(status,)
+            visible_rows.append((patient.patient_id, (status_text, missing_count, total_files), (status,)))
+        
+        self.sync_patient_tree(visible_rows)
+    
+    def get_patient_stats(self, patient: PatientData):
+        """Return (is_complete, missing_count, total_files, manually_complete) for a patient.
+        
+        Values are memoized per patient until invalidate_patient_stats() is
+        called for it, so re-filtering an unchanged project does no counting.
+        """
+        stats = self.stats_cache.get(patient.patient_id)
+        if stats is None:
+            stats = (
+                patient.is_complete(),
+                len(patient.get_missing_data_types()),
+                sum(1 for _ in patient.iter_all_files()),
+                patient.manually_complete
             )
+            self.stats_cache[patient.patient_id] = stats
+        return stats
+    
+    def invalidate_patient_stats(self, patient: Optional[PatientData]):
+        """Drop the memoized list values of a patient after its data changed."""
+        if patient is not None:
+            self.stats_cache.pop(patient.patient_id, None)
+    
+    def sync_patient_tree(self, visible_rows):
+        """Make the patient tree show exactly the given rows, in order.
         
-        # Configure tags for visual styling
-        self.patient_tree.tag_configure("complete", foreground="green")
-        self.patient_tree.tag_configure("incomplete", foreground="orange")
-        self.patient_tree.tag_configure("manual", foreground="blue")
+        visible_rows holds (patient_id, values, tags) tuples. Rows stay in
+        the tree (detached while filtered out) until another project is
+        loaded, so only rows that appear, disappear or change are touched.
+        """
+        tree = self.patient_tree
+        if not self.tree_items:
+            self.insert_patient_rows(visible_rows)
+            return
+        
+        visible_ids = {patient_id for patient_id, _, _ in visible_rows}
+        
+        # Hide rows that no longer match
+        attached = set(tree.get_children())
+        hidden = [item for patient_id, item in self.tree_items.items()
+                  if item in attached and patient_id not in visible_ids]
+        if hidden:
+            tree.detach(*hidden)
+            attached.difference_update(hidden)
+        
+        for index, (patient_id, values, tags) in enumerate(visible_rows):
+            item = self.tree_items.get(patient_id)
+            if item is None:
+                self.tree_items[patient_id] = tree.insert("", index, text=patient_id, values=values, tags=tags)
+                self.row_cache[patient_id] = (values, tags)
+                continue
+            
+            # Only rows whose values changed are reconfigured
+            if self.row_cache[patient_id] != (values, tags):
+                tree.item(item, values=values, tags=tags)
+                self.row_cache[patient_id] = (values, tags)
+            
+            # Rows shown again go back to their place in project order
+            if item not in attached:
+                tree.move(item, "", index)
+    
+    def insert_patient_rows(self, rows):
+        """Append (patient_id, values, tags) rows to the patient tree in a single Tcl call."""
+        items = self.insert_tree_rows(
+            self.patient_tree, "", [(patient_id, values, tags, "") for patient_id, values, tags in rows]
+        )
+        for (patient_id, values, tags), item in zip(rows, items):
+            self.tree_items[patient_id] = item
+            self.row_cache[patient_id] = (values, tags)
+    
+    def insert_tree_rows(self, tree, parent, rows):
+        """Append (text, values, tags, image) rows under parent and return the new item ids."""
+        flat_rows = []
+        for row in rows:
+            flat_rows.extend(row)
+        return tree.tk.splitlist(tree.tk.call(self.INSERT_ROWS_PROC, str(tree), parent, tuple(flat_rows)))
     
     def update_patient_list(self):
         """Update the patient list (alias for populate_patient_list)."""
         self.populate_patient_list()
         
+    def schedule_filter(self, *args):
+        """Apply the text filter once typing pauses."""
+        self.cancel_scheduled_filter()
+        self.filter_after_id = self.parent.after(self.FILTER_DEBOUNCE_MS, self.filter_patients)
+        
+    def cancel_scheduled_filter(self):
+        """Cancel a pending debounced filter, if any."""
+        if self.filter_after_id is not None:
+            self.parent.after_cancel(self.filter_after_id)
+            self.filter_after_id = None
+        
     def filter_patients(self, *args):
         """Filter the patient list based on current filters."""
+        self.cancel_scheduled_filter()
         if not self.project_data:
             return
             
         # Get filter values
         text_filter = self.filter_var.get().lower()
         status_filter = self.status_filter_var.get()
+        if status_filter == "all" and len(text_filter) < self.FILTER_MIN_LENGTH:
+            text_filter = ""
         
-        # Clear current items
-        for item in self.patient_tree.get_children():
-            self.patient_tree.delete(item)
-            
-        # Apply filters
-        for patient in self.project_data.patients:
+        # The list already shows this filter (e.g. only a first letter was typed)
+        if (text_filter, status_filter) == self.shown_filter:
+            return
+        self.shown_filter = (text_filter, status_filter)
+        
+        # Cleared filters show every patient; no per-patient test needed
+        if not text_filter and status_filter == "all":
+            self.render_patient_rows()
+            return
+        
+        def matches(patient_id_lower, is_complete):
             # Text filter
-            if text_filter and text_filter not in patient.patient_id.lower():
-                continue
-                
+            if text_filter and text_filter not in patient_id_lower:
+                return False
             # Status filter
-            is_complete = patient.is_complete()
-            if status_filter == "complete" and not is_complete:
-                continue
-            elif status_filter == "incomplete" and is_complete:
-                continue
-                
-            # Add patient to tree with proper status indication
-            missing_count = len(patient.get_missing_data_types())
-            total_files = len(patient.get_all_files())
-            
-            # Determine status text and tag
-            if patient.manually_complete:
-                status_text = "✓M"  # M for Manual
-                status = "manual"
-            elif is_complete:
-                status_text = "✓"
-                status = "complete"
-            else:
-                status_text = "⚠"
-                status = "incomplete"
-            
-            self.patient_tree.insert(
-                "",
-                tk.END,
-                text=patient.patient_id,
-                values=(status_text, missing_count, total_files),
-                tags=(status,)
-            )
+            if status_filter == "complete":
+                return is_complete
+            if status_filter == "incomplete":
+                return not is_complete
+            return True
+        
+        self.render_patient_rows(matches)
             
     def on_patient_select(self, event):
         """Handle patient selection."""
@@ -510,6 +745,8 @@ class PatientBrowser:
     def show_patient_details(self, patient: PatientData):
         """Show details for the selected patient."""
         self.current_patient = patient
+        # Details are shown again after every edit; the list values follow
+        self.invalidate_patient_stats(patient)
         self.details_header.config(text=f"Patient: {patient.patient_id}")
         
         # Enable toolbar buttons
@@ -541,71 +778,57 @@ class PatientBrowser:
         # Update files tab
         self.populate_files_tree(patient)
         
-        # Update issues tab
-        self.populate_issues_text(patient)
+        # Update issues tab (now if it is shown, otherwise once it is selected)
+        self.issues_dirty = True
+        self.refresh_issues_text()
+        
+    def refresh_issues_text(self):
+        """Rebuild the issues text if it is out of date and the Issues tab is shown."""
+        if not self.issues_dirty or self.current_patient is None:
+            return
+        if self.details_notebook.select() != str(self.issues_frame):
+            return
+        self.issues_dirty = False
+        self.populate_issues_text(self.current_patient)
         
     def update_completeness_overview(self, patient: PatientData):
         """Update the completeness overview section."""
-        missing_types = patient.get_missing_data_types()
+        # Count and file (single-file slots only) of every data type, gathered once
+        present = {data_type: row[0](patient) for data_type, row in _OVERVIEW_ROWS.items()}
         
         # Update each data type status
         for data_type, display_name, requirement, description in self.required_data_types:
             labels = self.data_type_labels[data_type]
+            row = _OVERVIEW_ROWS.get(data_type)
             
-            # Determine status and count
-            if data_type == DataType.CBCT_DICOM:
-                count = len(patient.cbct_files)
-                status = "✅ Present" if count > 0 else "❌ Missing"
-                status_color = "green" if count > 0 else "red"
-                details_text = f"{count} DICOM files found" if count > 0 else "No CBCT DICOM files detected"
-                
-            elif data_type == DataType.IOS_UPPER:
-                has_file = patient.ios_upper is not None
-                count = 1 if has_file else 0
-                status = "✅ Present" if has_file else "❌ Missing"
-                status_color = "green" if has_file else "red"
-                details_text = f"File: {patient.ios_upper.filename}" if has_file else "No upper jaw scan found"
-                
-            elif data_type == DataType.IOS_LOWER:
-                has_file = patient.ios_lower is not None
-                count = 1 if has_file else 0
-                status = "✅ Present" if has_file else "❌ Missing"
-                status_color = "green" if has_file else "red"
-                details_text = f"File: {patient.ios_lower.filename}" if has_file else "No lower jaw scan found"
-                
-            elif data_type == DataType.TELERADIOGRAPHY:
-                has_file = patient.teleradiography is not None
-                count = 1 if has_file else 0
-                status = "✅ Present" if has_file else "❌ Missing"
-                status_color = "green" if has_file else "red"
-                details_text = f"File: {patient.teleradiography.filename}" if has_file else "No teleradiography found"
-                
-            elif data_type == DataType.ORTHOPANTOMOGRAPHY:
-                has_file = patient.orthopantomography is not None
-                count = 1 if has_file else 0
-                status = "✅ Present" if has_file else "❌ Missing"
-                status_color = "green" if has_file else "red"
-                details_text = f"File: {patient.orthopantomography.filename}" if has_file else "No orthopantomography found"
-                
-            elif data_type == DataType.INTRAORAL_PHOTO:
-                count = len(patient.intraoral_photos)
-                status = "✅ Present" if count > 0 else "⚠️ Optional"
-                status_color = "green" if count > 0 else "orange"
-                details_text = f"{count} intraoral photos found" if count > 0 else "No intraoral photos (optional)"
-            
-            else:
+            # Determine status and details
+            if row is None:
                 count = 0
                 status = "❓ Unknown"
                 status_color = "gray"
                 details_text = "Unknown data type"
+            else:
+                _, present_details, missing_details = row
+                count, file_data = present[data_type]
+                if count > 0:
+                    status, status_color = "✅ Present", "green"
+                    details_text = present_details.format(
+                        count=count, filename=file_data.filename if file_data else ""
+                    )
+                elif data_type in self.REQUIRED_DATA_TYPES:
+                    status, status_color = "❌ Missing", "red"
+                    details_text = missing_details
+                else:
+                    status, status_color = "⚠️ Optional", "orange"
+                    details_text = missing_details
             
             # Update labels
-            labels['status'].config(text=status, foreground=status_color)
-            labels['count'].config(text=str(count))
-            labels['details'].config(text=details_text)
+            self.configure_label(labels['status'], text=status, foreground=status_color)
+            self.configure_label(labels['count'], text=str(count))
+            self.configure_label(labels['details'], text=details_text)
         
         # Update overall status
-        required_missing = [dt for dt in missing_types if dt != DataType.INTRAORAL_PHOTO]
+        required_missing = [dt for dt, (count, _) in present.items() if not count and dt in self.REQUIRED_DATA_TYPES]
         unmatched_count = len(patient.unmatched_files)
         
         if not required_missing and unmatched_count == 0:
@@ -622,65 +845,105 @@ class PatientBrowser:
             overall_status = "❓ Status unknown"
             overall_color = "gray"
         
-        self.overall_status_label.config(text=overall_status, foreground=overall_color)
+        self.configure_label(self.overall_status_label, text=overall_status, foreground=overall_color)
         
         # Update unmatched files indicator
         if unmatched_count > 0:
-            self.unmatched_files_label.config(
+            self.configure_label(
+                self.unmatched_files_label,
                 text=f"📄 {unmatched_count} unmatched files need mapping",
                 foreground="orange"
             )
         else:
-            self.unmatched_files_label.config(text="", foreground="black")
+            self.configure_label(self.unmatched_files_label, text="", foreground="black")
+    
+    def configure_label(self, label, **options):
+        """Configure an overview label unless it already shows these options."""
+        if self.shown_label_options.get(label) != options:
+            label.config(**options)
+            self.shown_label_options[label] = options
     
-    def create_thumbnail(self, file_path, size=(100, 70)):
-        """Create a thumbnail for image files."""
+    def request_thumbnail(self, item, file_path):
+        """Show the thumbnail of an image row, decoding it in the background if needed."""
+        if not PIL_AVAILABLE:
+            return
+        cache_key = (file_path, self.THUMBNAIL_SIZE)
+        photo = self.image_cache.get(cache_key)
+        if photo is not None:
+            self.image_cache.move_to_end(cache_key)
+            self.set_row_thumbnail(item, photo)
+            return
+        if cache_key in self.thumbnail_failures:
+            return
+        
+        waiting = self.pending_thumbnails.get(cache_key)
+        if waiting is not None:
+            # Already being decoded; show it on this row as well when ready
+            waiting.add(item)
+            return
+        self.pending_thumbnails[cache_key] = {item}
+        
+        future = self.thumbnail_pool.submit(self.decode_thumbnail, file_path, self.THUMBNAIL_SIZE)
+        self.thumbnail_futures[cache_key] = future
+        # PhotoImage must be created on the Tk thread, and Tk must not be called from workers
+        future.add_done_callback(lambda f: self.thumbnail_queue.put((cache_key, f)))
+        if self.thumbnail_drain_id is None:
+            self.thumbnail_drain_id = self.files_tree.after(self.THUMBNAIL_DRAIN_INTERVAL_MS, self.drain_thumbnail_queue)
+        
+    def drain_thumbnail_queue(self):
+        """Show finished thumbnails on the Tk thread; keep polling while decodes are running."""
+        self.thumbnail_drain_id = None
+        while True:
+            try:
+                cache_key, future = self.thumbnail_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.on_thumbnail_ready(cache_key, future)
+        
+        if self.thumbnail_futures:
+            self.thumbnail_drain_id = self.files_tree.after(self.THUMBNAIL_DRAIN_INTERVAL_MS, self.drain_thumbnail_queue)
+        
+    def set_row_thumbnail(self, item, photo):
+        """Attach a thumbnail to a files tree row unless it already shows it."""
+        # Rows whose thumbnail was evicted from the cache get the fresh one
+        if self.row_images.get(item) != str(photo):
+            self.files_tree.item(item, image=photo)
+            self.row_images[item] = str(photo)
+        
+    @staticmethod
+    def decode_thumbnail(file_path, size):
+        """Decode an image file into a padded thumbnail (runs on a worker thread)."""
         try:
-            # Check if it's an image file and not DICOM/STL
-            file_lower = file_path.lower()
-            
-            # Skip DICOM and STL files
-            if file_lower.endswith('.dcm') or file_lower.endswith('.stl'):
-                return None
-                
-            # Check for supported image formats
-            supported_formats = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.tif')
-            if not any(file_lower.endswith(fmt) for fmt in supported_formats):
+            # Check for supported image formats (DICOM/STL are never previewed)
+            if not is_image_file(file_path):
                 return None
                 
-            # Check if already cached
-            cache_key = f"{file_path}_{size}"
-            if cache_key in self.image_cache:
-                return self.image_cache[cache_key]
-                
-            # Import PIL here to avoid import errors if not available
-            from PIL import Image, ImageTk
-            import os
-            
             # Check if file exists and is not empty
             if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
                 return None
                 
             # Open and process image
             with Image.open(file_path) as image:
-                # Convert RGBA to RGB if necessary (for JPEG compatibility)
+                # Let the JPEG decoder scale down by 1/2..1/8 while decoding
+                if image.format == 'JPEG':
+                    image.draft('RGB', size)
+                    
+                # Palette images would otherwise be resized with nearest-neighbour sampling
+                if image.mode == 'P':
+                    image = image.convert('RGB')
+                    
+                # Create thumbnail while preserving aspect ratio (in place, before any
+                # conversion, so no full-resolution copy is made)
+                image.thumbnail(size, Image.Resampling.LANCZOS)
+                
+                # Flatten transparency onto a white background
                 if image.mode in ('RGBA', 'LA'):
-                    # Create white background
                     background = Image.new('RGB', image.size, (255, 255, 255))
-                    if image.mode == 'RGBA':
-                        background.paste(image, mask=image.split()[-1])
-                    else:
-                        background.paste(image)
+                    background.paste(image, mask=image.split()[-1])
                     image = background
-                elif image.mode == 'P':
-                    image = image.convert('RGB')
-                    
-                # Create thumbnail while preserving aspect ratio
-                image_copy = image.copy()
-                image_copy.thumbnail(size, Image.Resampling.LANCZOS)
                 
                 # Create a new image with padding to center the thumbnail
-                thumb_width, thumb_height = image_copy.size
+                thumb_width, thumb_height = image.size
                 max_width, max_height = size
                 
                 # Create a new image with light gray background for better contrast
@@ -691,29 +954,62 @@ class PatientBrowser:
                 y = (max_height - thumb_height) // 2
                 
                 # Paste the thumbnail onto the padded image
-                padded_image.paste(image_copy, (x, y))
-                
-                # Create PhotoImage
-                photo = ImageTk.PhotoImage(padded_image)
+                padded_image.paste(image, (x, y))
                 
-                # Cache the image (limit cache size to prevent memory issues)
-                if len(self.image_cache) > 50:  # Clear cache if it gets too large
-                    self.image_cache.clear()
-                    
-                self.image_cache[cache_key] = photo
-                
-                return photo
+                return padded_image
             
         except Exception as e:
             # Silently fail for unsupported files or errors
             print(f"Warning: Could not create thumbnail for {file_path}: {e}")
             return None
         
+    def on_thumbnail_ready(self, cache_key, future):
+        """Turn a decoded thumbnail into a PhotoImage and show it on the waiting rows."""
+        # Cancelled when another patient was shown
+        if self.thumbnail_futures.get(cache_key) is not future:
+            return
+        del self.thumbnail_futures[cache_key]
+        items = self.pending_thumbnails.pop(cache_key, ())
+        image = future.result()
+        if image is None:
+            self.thumbnail_failures.add(cache_key)
+            return
+        
+        photo = ImageTk.PhotoImage(image)
+        
+        # Cache the image, evicting the least recently used one when full
+        self.image_cache[cache_key] = photo
+        if len(self.image_cache) > self.thumbnail_cache_size:
+            self.image_cache.popitem(last=False)
+        
+        for item in items:
+            # Rows of a previously shown patient are gone
+            if item in self.image_rows:
+                self.set_row_thumbnail(item, photo)
+        
+    def cancel_pending_thumbnails(self):
+        """Drop thumbnail decodes that have not started yet."""
+        for cache_key, future in list(self.thumbnail_futures.items()):
+            if future.cancel():
+                del self.thumbnail_futures[cache_key]
+                self.pending_thumbnails.pop(cache_key, None)
+        
+    def shutdown_thumbnails(self, event=None):
+        """Drop queued thumbnail decodes and stop the decode workers."""
+        self.cancel_pending_thumbnails()
+        self.thumbnail_pool.shutdown(wait=False, cancel_futures=True)
+        
     def populate_files_tree(self, patient: PatientData):
         """Populate the files tree with patient files grouped by type."""
         # Clear existing items
-        for item in self.files_tree.get_children():
-            self.files_tree.delete(item)
+        self.files_tree.delete(*self.files_tree.get_children())
+        self.cancel_pending_thumbnails()
+        self.image_rows = {}
+        self.row_images = {}
+        # group item -> (group_name, files, patient) of groups not opened yet
+        self.pending_group_files = {}
+        # Files that failed to decode get another try when the patient is shown again
+        self.thumbnail_failures.clear()
         
         # Separate excluded files from regular files
         excluded_files = []
@@ -817,26 +1113,8 @@ class PatientBrowser:
         if excluded_files:
             file_groups[f"🚫 Excluded Files"] = excluded_files
         
-        # Determine if we have any image files that need previews
-        has_image_files = False
-        total_image_files = 0
-        
-        for group_name, files in file_groups.items():
-            for file_data in files:
-                if self.is_image_file(file_data.path):
-                    has_image_files = True
-                    total_image_files += 1
-        
-        # Set appropriate row height based on content
-        style = ttk.Style()
-        
-        # Use tall rows if we have any image files (simplified logic)
-        if has_image_files:
-            style.configure("FilesPreview.Treeview", rowheight=80)
-        else:
-            style.configure("FilesPreview.Treeview", rowheight=25)
-        
         # Add groups to tree
+        image_rows_added = 0
         for group_name, files in file_groups.items():
             if not files:  # Skip empty groups
                 continue
@@ -874,68 +1152,16 @@ class PatientBrowser:
                 
             self.files_tree.item(group_id, tags=(group_tag,))
             
-            # Determine if we should show thumbnails for this view
-            # Simplified: always show thumbnails for image files
-            show_thumbnails = has_image_files
-            
-            # Add files to group
-            for file_data in files:
-                # Handle special zip package file
-                if hasattr(file_data, 'filename') and file_data.filename.endswith('.zip') and "Package" in group_name:
-                    file_id = self.files_tree.insert(
-                        group_id,
-                        tk.END,
-                        text=file_data.filename,
-                        values=("ZIP Package", file_data.path, "packaged"),
-                        tags=("packaged",)
-                    )
-                    continue
-                
-                data_type = file_data.data_type.value if file_data.data_type else "Unknown"
-                status = file_data.status.value if hasattr(file_data, 'status') else "Unknown"
-                
-                # Check if file is excluded
-                is_excluded = file_data.data_type == DataType.EXCLUDE
-                # Check if we're in the excluded group (don't duplicate the EXCLUDED label)
-                in_excluded_group = "🚫" in group_name
-                
-                # Create thumbnail for image files
-                thumbnail = None
-                
-                if self.is_image_file(file_data.path):
-                    # Always try to create thumbnails for image files
-                    thumbnail = self.create_thumbnail(file_data.path, size=(100, 70))
-                    if thumbnail:
-                        print(f"✅ Created thumbnail for: {file_data.filename}")
-                    else:
-                        print(f"❌ Failed to create thumbnail for: {file_data.filename}")
-                
-                # Only add "(EXCLUDED)" prefix if NOT in excluded group (to avoid redundancy)
-                if is_excluded and not in_excluded_group:
-                    display_name = f"🚫 {file_data.filename} (EXCLUDED)"
-                else:
-                    display_name = file_data.filename
-                    
-                file_tags = (status, "excluded") if is_excluded else (status,)
-                
-                file_id = self.files_tree.insert(
-                    group_id,
-                    tk.END,
-                    text=display_name,
-                    values=(data_type, file_data.path, status),
-                    tags=file_tags,
-                    image=thumbnail if thumbnail else ""
-                )
-            
-            # Add NIfTI file for CBCT group if it exists
-            if "CBCT DICOM" in group_name and patient.nifti_conversion_path and os.path.exists(patient.nifti_conversion_path):
-                nifti_file_id = self.files_tree.insert(
-                    group_id,
-                    tk.END,
-                    text=f"📁 {os.path.basename(patient.nifti_conversion_path)} (Converted NIfTI)",
-                    values=("NIfTI", patient.nifti_conversion_path, "converted"),
-                    tags=("converted",)
-                )
+            if should_expand:
+                image_rows_added += self.insert_file_rows(group_id, group_name, files, patient)
+            else:
+                # Rows of collapsed groups are inserted when the group is first opened;
+                # the placeholder child keeps the expand arrow
+                self.files_tree.insert(group_id, tk.END, text="Loading...", values=("", "", ""))
+                self.pending_group_files[group_id] = (group_name, files, patient)
+        
+        # Use tall rows if any shown row has an image preview
+        self.set_files_row_height(image_rows_added > 0)
         
         # Configure tags for visual feedback
         self.files_tree.tag_configure("matched", foreground="green")
@@ -952,6 +1178,86 @@ class PatientBrowser:
         self.files_tree.tag_configure("missing_group", foreground="gray", font=("Arial", 10, "bold"))
         self.files_tree.tag_configure("excluded_group", foreground="gray", font=("Arial", 10, "bold"))
         
+        self.schedule_thumbnail_load()
+        
+    def insert_file_rows(self, group_id, group_name, files, patient: PatientData):
+        """Insert the file rows of a files tree group and return how many show a thumbnail."""
+        # (text, values, tags, image) per row, and the path of each row that gets a thumbnail
+        rows = []
+        thumbnail_paths = []
+        placeholder = str(self.placeholder_thumbnail)
+        
+        # Add files to group
+        for file_data in files:
+            # Handle special zip package file
+            if hasattr(file_data, 'filename') and file_data.filename.endswith('.zip') and "Package" in group_name:
+                rows.append((file_data.filename, ("ZIP Package", file_data.path, "packaged"), ("packaged",), ""))
+                thumbnail_paths.append(None)
+                continue
+            
+            data_type = file_data.data_type.value if file_data.data_type else "Unknown"
+            status = file_data.status.value if hasattr(file_data, 'status') else "Unknown"
+            
+            # Check if file is excluded
+            is_excluded = file_data.data_type == DataType.EXCLUDE
+            # Check if we're in the excluded group (don't duplicate the EXCLUDED label)
+            in_excluded_group = "🚫" in group_name
+            
+            # Only add "(EXCLUDED)" prefix if NOT in excluded group (to avoid redundancy)
+            if is_excluded and not in_excluded_group:
+                display_name = f"🚫 {file_data.filename} (EXCLUDED)"
+            else:
+                display_name = file_data.filename
+                
+            file_tags = (status, "excluded") if is_excluded else (status,)
+            
+            # Thumbnails are created once the row scrolls into view
+            has_thumbnail = PIL_AVAILABLE and is_image_file(file_data.path)
+            
+            rows.append((
+                display_name,
+                (data_type, file_data.path, status),
+                file_tags,
+                placeholder if has_thumbnail else ""
+            ))
+            thumbnail_paths.append(file_data.path if has_thumbnail else None)
+        
+        # Add NIfTI file for CBCT group if it exists
+        if "CBCT DICOM" in group_name and patient.nifti_conversion_path and os.path.exists(patient.nifti_conversion_path):
+            rows.append((
+                f"📁 {os.path.basename(patient.nifti_conversion_path)} (Converted NIfTI)",
+                ("NIfTI", patient.nifti_conversion_path, "converted"),
+                ("converted",),
+                ""
+            ))
+            thumbnail_paths.append(None)
+        
+        # One Tcl call for the whole group
+        image_rows_added = 0
+        for file_id, file_path in zip(self.insert_tree_rows(self.files_tree, group_id, rows), thumbnail_paths):
+            if file_path is not None:
+                self.image_rows[file_id] = file_path
+                image_rows_added += 1
+        
+        return image_rows_added
+        
+    def set_files_row_height(self, with_previews: bool):
+        """Use tall rows while the files tree shows image previews."""
+        row_height = self.FILES_PREVIEW_ROW_HEIGHT if with_previews else self.FILES_ROW_HEIGHT
+        if row_height != self.files_row_height:
+            ttk.Style().configure("FilesPreview.Treeview", rowheight=row_height)
+            self.files_row_height = row_height
+        
+    def on_files_group_open(self, event):
+        """Insert the rows of a collapsed group the first time it is opened."""
+        group_id = self.files_tree.focus()
+        pending = self.pending_group_files.pop(group_id, None)
+        if pending is not None:
+            self.files_tree.delete(*self.files_tree.get_children(group_id))
+            if self.insert_file_rows(group_id, *pending):
+                self.set_files_row_height(True)
+        self.schedule_thumbnail_load()
+        
     def populate_issues_text(self, patient: PatientData):
         """Populate the issues text widget."""
         self.issues_text.config(state=tk.NORMAL)
@@ -1068,61 +1374,29 @@ class PatientBrowser:
         
         patient = self.current_patient
         
-        # Find and remove the file from all lists
+        # Find the file through the patient's path index, then the slot holding it
+        file_data = patient.find_file(file_path)
         removed = False
         location = None
         
-        # Check unmatched files
-        for f in patient.unmatched_files[:]:  # Use slice to avoid modification during iteration
-            if f.path == file_path:
-                patient.unmatched_files.remove(f)
-                removed = True
-                location = "Unmatched files"
-                break
-        
-        # Check CBCT files
-        if not removed:
-            for f in patient.cbct_files[:]:
-                if f.path == file_path:
-                    patient.cbct_files.remove(f)
-                    removed = True
-                    location = "CBCT files"
-                    break
-        
-        # Check IOS upper
-        if not removed and patient.ios_upper and patient.ios_upper.path == file_path:
-            patient.ios_upper = None
-            removed = True
-            location = "IOS Upper scan"
-        
-        # Check IOS lower
-        if not removed and patient.ios_lower and patient.ios_lower.path == file_path:
-            patient.ios_lower = None
-            removed = True
-            location = "IOS Lower scan"
-        
-        # Check intraoral photos
-        if not removed:
-            for f in patient.intraoral_photos[:]:
-                if f.path == file_path:
-                    patient.intraoral_photos.remove(f)
+        if file_data is not None:
+            for attribute, holds_list, slot_name in _FILE_SLOTS:
+                slot = getattr(patient, attribute)
+                if holds_list:
+                    # FileData compares by identity, so this never compares fields
+                    if file_data in slot:
+                        slot.remove(file_data)
+                        removed = True
+                elif slot is file_data:
+                    setattr(patient, attribute, None)
                     removed = True
-                    location = "Intraoral photos"
+                if removed:
+                    location = slot_name
                     break
         
-        # Check teleradiography
-        if not removed and patient.teleradiography and patient.teleradiography.path == file_path:
-            patient.teleradiography = None
-            removed = True
-            location = "Teleradiography"
-        
-        # Check orthopantomography
-        if not removed and patient.orthopantomography and patient.orthopantomography.path == file_path:
-            patient.orthopantomography = None
-            removed = True
-            location = "Orthopantomography (Panoramic)"
-        
         if removed:
+            patient.unindex_file(file_data)
+            patient.invalidate_completeness()
             return True, f"File removed from {location}"
         else:
             return False, f"File not found in patient data.\n\nPath: {file_path}\n\nThe file may have already been removed or was never part of this patient's records."
@@ -1208,24 +1482,10 @@ class PatientBrowser:
         
         from core.models import MatchStatus  # Import here to avoid circular imports
         
-        for file_data in self.current_patient.unmatched_files:
-            filename_lower = file_data.filename.lower()
-            suggested_type = None
-            
-            # CBCT DICOM detection
-            if (filename_lower.endswith('.dcm') or 
-                'slice' in filename_lower or 
-                '3d' in filename_lower or
-                'cbct' in filename_lower):
-                suggested_type = DataType.CBCT_DICOM
-                
-            # STL file patterns
-            elif filename_lower.endswith('.stl'):
-                if any(keyword in filename_lower for keyword in ['upper', 'max', 'superiore', 'mascella', 'mascellare', 'maxilla', 'maxillari', 'maxillar']):
-                    suggested_type = DataType.IOS_UPPER
-                elif any(keyword in filename_lower for keyword in ['lower', 'man', 'inferiore', 'mandibola', 'mandibolar', 'mandible', 'mandibular']):
-                    suggested_type = DataType.IOS_LOWER
-                    
+        # Same rules as the bulk mapping dialog's smart auto-map
+        files = self.current_patient.unmatched_files
+        suggestions = classify_filenames([f.filename for f in files])
+        for file_data, suggested_type in zip(files, suggestions):
             if suggested_type:
                 file_data.data_type = suggested_type
                 file_data.confidence = 0.8
@@ -1235,9 +1495,13 @@ class PatientBrowser:
                 files_to_remove.append(file_data)
                 mappings_made += 1
         
-        # Remove mapped files
-        for file_data in files_to_remove:
-            self.current_patient.unmatched_files.remove(file_data)
+        # Remove mapped files in one pass (FileData hashes by identity)
+        if files_to_remove:
+            mapped = set(files_to_remove)
+            self.current_patient.unmatched_files[:] = [
+                f for f in self.current_patient.unmatched_files if f not in mapped
+            ]
+            self.current_patient.invalidate_completeness()
         
         # Update cache with auto-mapping changes
         if mappings_made > 0:
@@ -1275,6 +1539,7 @@ class PatientBrowser:
             self.current_patient.orthopantomography = file_data
         elif data_type == DataType.INTRAORAL_PHOTO:
             self.current_patient.intraoral_photos.append(file_data)
+        self.current_patient.invalidate_completeness()
         
         # Update cache with manual assignment
         self._update_patient_cache()
@@ -1366,6 +1631,9 @@ class PatientBrowser:
     
     def _update_patient_cache(self):
         """Update cache with current patient data after manual changes."""
+        self.invalidate_patient_stats(self.current_patient)
+        if self.on_project_changed:
+            self.on_project_changed()
         if self.current_patient and hasattr(self.project_manager, 'file_analyzer'):
             self.project_manager.file_analyzer.update_cache(self.current_patient)
     
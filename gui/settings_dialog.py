@@ -346,6 +346,7 @@ class SettingsDialog:
             "confidence_threshold": 0.5,
             "include_subfolders": True,
             "case_sensitive": False,
+            "exists_check_ttl": 0.0,  # Seconds to reuse a file existence check (0 = always check)
             "cbct_patterns": ["cbct", "cone.*beam", "3d", "dicom", "ct"],
             "ios_patterns": ["scansioni", "scan", "ios", "intraoral.*scan", "stl"]
         }
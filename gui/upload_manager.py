@@ -271,7 +271,7 @@ class UploadManager:
         """Estimate the total size of patient files."""
         total_size = 0
         try:
-            for file_data in patient.get_all_files():
+            for file_data in patient.iter_all_files():
                 if hasattr(file_data, 'path') and file_data.path:
                     try:
                         total_size += os.path.getsize(file_data.path)
@@ -0,0 +1,65 @@
+"""
+Test script to verify the memoized patient completeness check
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.models import PatientData, FileData, DataType
+
+def make_complete_patient():
+    """Create a patient with every required data type assigned"""
+    patient = PatientData(patient_id="TEST_COMPLETE", folder_path="C:/test")
+    patient.cbct_files = [FileData(path="C:/test/cbct1.dcm", data_type=DataType.CBCT_DICOM)]
+    patient.ios_upper = FileData(path="C:/test/upper.stl", data_type=DataType.IOS_UPPER)
+    patient.ios_lower = FileData(path="C:/test/lower.stl", data_type=DataType.IOS_LOWER)
+    patient.teleradiography = FileData(path="C:/test/tele.jpg", data_type=DataType.TELERADIOGRAPHY)
+    patient.orthopantomography = FileData(path="C:/test/opt.jpg", data_type=DataType.ORTHOPANTOMOGRAPHY)
+    return patient
+
+def test_replaced_unmatched_files():
+    """Replacing unmatched_files with a same-length list must not reuse the memoized result"""
+
+    print("=" * 60)
+    print("Testing completeness after replacing unmatched_files")
+    print("=" * 60)
+
+    patient = make_complete_patient()
+
+    # A real unmatched file makes the patient incomplete
+    patient.unmatched_files = [FileData(path="C:/test/notes.txt")]
+    assert not patient.is_complete()
+
+    # Replace the list twice before checking again: the second replacement
+    # typically reuses the memory (and id()) of the list the result was
+    # memoized for. Same length, but only a system file, so complete again.
+    patient.unmatched_files = [FileData(path="C:/test/.DS_Store")]
+    patient.unmatched_files = [FileData(path="C:/test/Thumbs.db")]
+    assert patient.is_complete() == patient._compute_is_complete()
+    assert patient.is_complete()
+    
+    # And back to a significant file
+    patient.unmatched_files = [FileData(path="C:/test/other.txt")]
+    assert not patient.is_complete()
+
+    print("✅ is_complete() follows replaced unmatched_files lists")
+
+def test_invalidate_after_in_place_swap():
+    """Swapping an unmatched file in place is picked up after invalidate_completeness()"""
+
+    patient = make_complete_patient()
+    patient.unmatched_files.append(FileData(path="C:/test/desktop.ini"))
+    assert patient.is_complete()
+
+    patient.unmatched_files[0] = FileData(path="C:/test/notes.txt")
+    patient.invalidate_completeness()
+    assert not patient.is_complete()
+
+    print("✅ invalidate_completeness() drops the memoized result")
+
+if __name__ == "__main__":
+    test_replaced_unmatched_files()
+    test_invalidate_after_in_place_swap()
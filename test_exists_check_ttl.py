@@ -0,0 +1,78 @@
+"""
+Test script to verify the opt-in reuse of file existence checks on reassignment
+"""
+
+import sys
+import os
+import tempfile
+import shutil
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import core.project_manager as project_manager_module
+from core.project_manager import ProjectManager
+from core.models import ProjectData, PatientData, FileData, DataType
+
+def make_manager(root, exists_check_ttl):
+    """Create a manager with one patient holding one unmatched STL file"""
+    file_path = os.path.join(root, "scan.stl")
+    with open(file_path, 'w') as f:
+        f.write("solid scan")
+
+    patient = PatientData(patient_id="P1", folder_path=root)
+    patient.unmatched_files = [FileData(path=file_path)]
+    patient.rebuild_path_index()
+
+    manager = ProjectManager(exists_check_ttl=exists_check_ttl)
+    manager.project_data = ProjectData(root_path=root, patients=[patient])
+    return manager, file_path
+
+def count_exists_calls(manager, file_path, assignments):
+    """Reassign the file repeatedly and count os.path.exists() calls on it"""
+    calls = []
+    real_exists = os.path.exists
+
+    def counting_exists(path):
+        if path == file_path:
+            calls.append(path)
+        return real_exists(path)
+
+    project_manager_module.os.path.exists = counting_exists
+    try:
+        for data_type in assignments:
+            assert manager.update_patient_file_assignment("P1", file_path, data_type)
+    finally:
+        project_manager_module.os.path.exists = real_exists
+    return len(calls)
+
+def test_exists_check_ttl():
+    """Existence checks are reused only inside the configured window"""
+
+    print("=" * 60)
+    print("Testing exists_check_ttl")
+    print("=" * 60)
+
+    assignments = [DataType.IOS_UPPER, DataType.IOS_LOWER, DataType.IOS_UPPER]
+    root = tempfile.mkdtemp()
+    try:
+        # Default: every reassignment stats the file
+        manager, file_path = make_manager(root, exists_check_ttl=0.0)
+        assert count_exists_calls(manager, file_path, assignments) == 3
+        print("✅ TTL 0 checks the file on every reassignment")
+
+        # Opted in: only the first reassignment stats the file
+        manager, file_path = make_manager(root, exists_check_ttl=60.0)
+        assert count_exists_calls(manager, file_path, assignments) == 1
+        print("✅ Reassignments inside the TTL skip the existence check")
+
+        # Outside the window the file is checked again
+        patient = manager.get_patient_by_id("P1")
+        patient.find_file(file_path).exists_checked_at -= 120.0
+        assert count_exists_calls(manager, file_path, [DataType.IOS_LOWER]) == 1
+        print("✅ Expired checks are repeated")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_exists_check_ttl()
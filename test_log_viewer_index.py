@@ -0,0 +1,170 @@
+"""
+Test the log viewer's line indexing without opening a window.
+"""
+
+import sys
+import os
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gui.log_viewer import LogViewerWindow
+
+class Var:
+    """Stand-in for the Tk variables read by build_filter_pattern()"""
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+def make_viewer(log_file, level="ALL", search=""):
+    """Create a viewer for log_file without building its window"""
+    viewer = object.__new__(LogViewerWindow)
+    viewer.log_file = Path(log_file)
+    viewer.filter_var = Var(level)
+    viewer.search_var = Var(search)
+    return viewer
+
+def write_log(path, lines, tail=""):
+    """Write complete lines (plus an optional partial last line) as bytes"""
+    data = "".join(line + "\n" for line in lines) + tail
+    with open(path, 'wb') as f:
+        f.write(data.encode('utf-8'))
+    return data.encode('utf-8')
+
+def indexed_lines(viewer, offset=0):
+    """Scan the log with the viewer's filters and return the indexed lines"""
+    starts, ends, line_count, end_offset = viewer.scan_log(offset, viewer.build_filter_pattern())
+    data = viewer.log_file.read_bytes()
+    lines = [data[start:end].decode('utf-8') for start, end in zip(starts, ends)]
+    return lines, line_count, end_offset
+
+SAMPLE = [
+    "2024-01-01 10:00:00 - app - INFO - Started",
+    "2024-01-01 10:00:01 - app - ERROR - Disk full",
+    "2024-01-01 10:00:02 - app - DEBUG - disk check",
+    "2024-01-01 10:00:03 - app - ERROR - Network down",
+    "2024-01-01 10:00:04 - app - WARNING - DISK almost full",
+]
+
+def check_filters(root):
+    """ALL, level, search and level+search filters index the right lines"""
+    log_file = os.path.join(root, "filters.log")
+    write_log(log_file, SAMPLE)
+    expected_lines = [line + "\n" for line in SAMPLE]
+
+    viewer = make_viewer(log_file)
+    assert viewer.build_filter_pattern() is None
+    lines, line_count, end_offset = indexed_lines(viewer)
+    assert lines == expected_lines, lines
+    assert line_count == 5 and end_offset == os.path.getsize(log_file)
+
+    lines, line_count, _ = indexed_lines(make_viewer(log_file, level="ERROR"))
+    assert lines == [expected_lines[1], expected_lines[3]], lines
+    assert line_count == 5  # Counts every scanned line, not just the matches
+
+    # Search is case-insensitive
+    lines, _, _ = indexed_lines(make_viewer(log_file, search="disk"))
+    assert lines == [expected_lines[1], expected_lines[2], expected_lines[4]], lines
+
+    lines, _, _ = indexed_lines(make_viewer(log_file, level="ERROR", search="disk"))
+    assert lines == [expected_lines[1]], lines
+
+    # Regex characters in the search text are literal
+    lines, _, _ = indexed_lines(make_viewer(log_file, search="full."))
+    assert lines == [], lines
+    print("✅ Filters index the matching lines")
+
+def check_partial_last_line(root):
+    """A partially written last line is left for the next scan"""
+    log_file = os.path.join(root, "partial.log")
+    data = write_log(log_file, SAMPLE[:2], tail="2024-01-01 10:00:02 - app - ERROR - half")
+
+    for viewer in (make_viewer(log_file), make_viewer(log_file, level="ERROR")):
+        lines, line_count, end_offset = indexed_lines(viewer)
+        assert line_count == 2, line_count
+        assert end_offset == data.rfind(b"\n") + 1
+        assert not any("half" in line for line in lines), lines
+
+    # Once completed, a scan from the previous end picks it up
+    with open(log_file, 'ab') as f:
+        f.write(b" written\n")
+    lines, line_count, _ = indexed_lines(make_viewer(log_file, level="ERROR"), end_offset)
+    assert lines == ["2024-01-01 10:00:02 - app - ERROR - half written\n"], lines
+    assert line_count == 1
+    print("✅ Partial last lines wait for their newline")
+
+def check_empty_file(root):
+    """An empty log indexes nothing"""
+    log_file = os.path.join(root, "empty.log")
+    write_log(log_file, [])
+
+    for viewer in (make_viewer(log_file), make_viewer(log_file, search="x")):
+        lines, line_count, end_offset = indexed_lines(viewer)
+        assert (lines, line_count, end_offset) == ([], 0, 0)
+    print("✅ Empty logs index nothing")
+
+def check_byte_range_start(root):
+    """A "Last N MB" range keeps a line starting exactly at its offset"""
+    log_file = os.path.join(root, "range.log")
+    data = write_log(log_file, SAMPLE)
+    size = len(data)
+    third_line = data.index(SAMPLE[2].encode())
+
+    viewer = make_viewer(log_file)
+    assert viewer.find_range_start(size - third_line) == third_line
+    # Starting mid-line moves on to the next full line
+    assert viewer.find_range_start(size - third_line - 1) == data.index(SAMPLE[3].encode())
+    # Ranges larger than the file start at the beginning
+    assert viewer.find_range_start(size + 100) == 0
+    print("✅ Byte ranges start on whole lines")
+
+def check_time_range_with_tracebacks(root):
+    """The "Last 1h" binary search skips traceback lines without timestamps"""
+    log_file = os.path.join(root, "time.log")
+    now = datetime.now()
+
+    def record(age, message):
+        stamp = (now - age).strftime(LogViewerWindow.TIMESTAMP_FORMAT)
+        return f"{stamp} - app - ERROR - {message}"
+
+    traceback_lines = ["Traceback (most recent call last):"]
+    traceback_lines += [f'  File "module_{i}.py", line {i}, in run' for i in range(40)]
+    traceback_lines.append("ValueError: boom")
+
+    old = [record(timedelta(hours=3, minutes=i), f"old {i}") for i in range(20, 0, -1)]
+    recent = [record(timedelta(minutes=30 - i), f"recent {i}") for i in range(10)]
+    lines = old + [record(timedelta(hours=2), "failed")] + traceback_lines + recent
+    data = write_log(log_file, lines)
+
+    viewer = make_viewer(log_file)
+    start = viewer.find_range_start(timedelta(hours=1))
+    assert start == data.index(recent[0].encode()), (start, data[start:start + 60])
+
+    # Spans older than the log start at 0, spans newer than its last record at EOF
+    assert viewer.find_range_start(timedelta(hours=5)) == 0
+    assert viewer.find_range_start(timedelta(minutes=1)) == len(data)
+    print("✅ Time ranges start at the first record inside the span")
+
+def test_log_viewer_index():
+    """Run all indexing checks against temporary logs"""
+    print("🧪 TESTING LOG VIEWER INDEXING")
+    print("=" * 60)
+
+    root = tempfile.mkdtemp()
+    try:
+        check_filters(root)
+        check_partial_last_line(root)
+        check_empty_file(root)
+        check_byte_range_start(root)
+        check_time_range_with_tracebacks(root)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_log_viewer_index()
@@ -0,0 +1,64 @@
+"""
+Test script to verify the upload index sidecar used in distributed cache mode
+"""
+
+import sys
+import os
+import tempfile
+import shutil
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.match_cache import MatchCache
+from core.models import PatientData
+
+def make_cache(index_dir):
+    """Create a distributed-mode cache whose upload index lives in index_dir"""
+    cache = MatchCache()
+    cache._upload_index_path = os.path.join(index_dir, "uploaded_index.json")
+    return cache
+
+def make_patient(root, patient_id):
+    """Create a cached patient folder"""
+    folder = os.path.join(root, patient_id)
+    os.makedirs(folder)
+    return PatientData(patient_id=patient_id, folder_path=folder)
+
+def test_upload_index():
+    """Two caches share the index file, and invalidation prunes it"""
+
+    print("=" * 60)
+    print("Testing the upload index sidecar")
+    print("=" * 60)
+
+    root = tempfile.mkdtemp()
+    try:
+        # Two instances, like the upload manager and the file analyzer
+        first = make_cache(root)
+        second = make_cache(root)
+
+        patient_a = make_patient(root, "A")
+        patient_b = make_patient(root, "B")
+        first.cache_matches(patient_a)
+        second.cache_matches(patient_b)
+
+        # Each instance sees the other's updates instead of overwriting them
+        assert first.get_uploaded_patients() == []
+        first.update_upload_status(patient_a.folder_path, "uploaded", remote_patient_id=1)
+        assert [p['patient_id'] for p in second.get_uploaded_patients()] == ["A"]
+        second.update_upload_status(patient_b.folder_path, "uploaded", remote_patient_id=2)
+        uploaded = sorted(p['patient_id'] for p in first.get_uploaded_patients())
+        assert uploaded == ["A", "B"], uploaded
+        print("✅ Both instances' uploads are kept in the index")
+
+        # Invalidating a patient's cache drops it from the index
+        first.invalidate_cache(patient_a.folder_path)
+        uploaded = [p['patient_id'] for p in second.get_uploaded_patients()]
+        assert uploaded == ["B"], uploaded
+        print("✅ invalidate_cache() prunes the upload index")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_upload_index()